@@ -0,0 +1,9 @@
+import sys
+
+try:
+    from .projectBatch import main
+except ImportError:
+    from projectBatch import main
+
+if __name__ == '__main__':
+    sys.exit(main())
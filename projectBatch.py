@@ -0,0 +1,93 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import sys
+import time
+
+try:
+    from . import projectUtil, projectSolver, projectIO
+except ImportError:
+    import projectUtil
+    import projectSolver
+    import projectIO
+
+# Level packs: level i of a pack is generated from job_seed(pack_seed, i), so a whole pack, or any
+# single level of it, can be baked again bit for bit. Each worker process writes its own .maze file
+# and only sends a small stats dict back, which keeps the pool close to linear in core count.
+# With stream=True rows go from projectUtil.stream_rows straight into the file, so a worker holds
+# O(N) memory for streaming algorithms (projectUtil.STREAMING) and mazes far too big for a grid in
+# memory can be baked; nothing is solved then and the finish is the far corner, which a perfect
+# maze always connects to the start.
+
+LEVEL_NAME = 'level_{:05d}.maze'
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+def job_seed(pack_seed, index):
+    # String seeding goes through SHA-512, so this is stable across processes, runs and platforms.
+    return random.Random(f'{pack_seed}:{index}').getrandbits(32)
+
+def bake_level(out_dir, index, N, algorithm, seed, difficulty, stream=False):
+    path = os.path.join(out_dir, LEVEL_NAME.format(index))
+    if stream:
+        finish = (N - 1, N - 1) if N > 1 else None
+        projectIO.write_maze_rows(path, projectUtil.stream_rows(N, algorithm, seed), N, seed, algorithm, (0, 0), finish)
+        return {'index': index, 'file': os.path.basename(path), 'N': N, 'algorithm': algorithm, 'seed': seed,
+                'finish': finish, 'solution_length': None, 'max_distance': None}
+    grid = projectUtil.generate(N, algorithm, seed)
+    S = 2 * N + 1
+    dist = projectSolver.distance_field(grid, S, (1, 1))
+    finish = projectSolver.pick_finish(dist, N, difficulty, seed)
+    projectIO.save_maze(path, grid, N, seed, algorithm, (0, 0), finish)
+    return {
+        'index': index, 'file': os.path.basename(path), 'N': N, 'algorithm': algorithm, 'seed': seed,
+        'finish': finish, 'solution_length': dist[finish[1] * N + finish[0]] if finish else None,
+        'max_distance': max(dist),
+    }
+
+def _bake_job(job):
+    return bake_level(*job)
+
+def bake_pack(out_dir, count, N, algorithm='backtracker', pack_seed=0, difficulty=1.0, workers=None, chunksize=None,
+              stream=False):
+    # Yields each level's stats in index order as soon as it is on disk.
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = ((out_dir, i, N, algorithm, job_seed(pack_seed, i), difficulty, stream) for i in range(count))
+    if workers == 1:
+        yield from map(_bake_job, jobs)
+        return
+    chunksize = chunksize or max(1, count // (workers * 8))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_bake_job, jobs, chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m MazeProject', description="Bake a pack of mazes into .maze files.")
+    parser.add_argument('count', type=int, help="number of mazes")
+    parser.add_argument('-n', '--size', type=int, default=25, help="cells per side (default 25)")
+    parser.add_argument('-a', '--algorithm', choices=sorted(projectUtil.ALGORITHMS), default='backtracker')
+    parser.add_argument('-s', '--seed', type=int, default=0, help="pack seed; level seeds derive from it")
+    parser.add_argument('-d', '--difficulty', type=float, default=1.0, help="finish placement, 0 (near) to 1 (farthest)")
+    parser.add_argument('-o', '--out', default='maze_pack', help="output directory")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--stream', action='store_true',
+                        help="write rows as they are generated, in O(N) memory with -a eller; the finish is the far corner, unsolved")
+    args = parser.parse_args(argv)
+    if args.count < 1 or args.size < 1:
+        parser.error("count and size must be positive")
+
+    workers = args.workers or os.cpu_count() or 1
+    os.makedirs(args.out, exist_ok=True)
+    t0 = time.perf_counter()
+    with open(os.path.join(args.out, MANIFEST_NAME), 'w') as manifest:
+        for done, stats in enumerate(bake_pack(args.out, args.count, args.size, args.algorithm, args.seed,
+                                               args.difficulty, workers, stream=args.stream), 1):
+            manifest.write(json.dumps(stats) + '\n')
+            if done % 1000 == 0:
+                print(f"{done}/{args.count} mazes ({done / (time.perf_counter() - t0):.1f}/s)", file=sys.stderr)
+    elapsed = time.perf_counter() - t0
+    print(f"{args.count} mazes of {args.size}x{args.size} ({args.algorithm}) in {elapsed:.2f}s: "
+          f"{args.count / elapsed:.1f} mazes/s on {workers} worker(s) -> {args.out}")
+    return 0
@@ -0,0 +1,440 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    from . import projectUtil, projectSolver, projectIO, projectStats, projectCache
+except ImportError:
+    import projectUtil
+    import projectSolver
+    import projectIO
+    import projectStats
+    import projectCache
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _measure(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def _generate_rows(N, algorithm, seed):
+    return projectUtil.MazeGrid.from_cells(projectUtil.generate(N, algorithm, seed), 2 * N + 1)
+
+def bench_generation(sizes=(25, 500, 5000), algorithm='backtracker', seed=0):
+    # Timing and peak memory are taken from separate runs so tracemalloc does not skew the clock.
+    results = []
+    for N in sizes:
+        elapsed, peak = _measure(_generate_rows, N, algorithm, seed)
+        results.append({'N': N, 'seconds': elapsed, 'peak_bytes': peak})
+    return results
+
+def bench_moves(N=25, moves=1000000, seed=0):
+    # Random walk through the headless engine; the finish is parked on a wall so the walk never ends.
+    S = 2 * N + 1
+    grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, 'backtracker', seed), S)
+    rng = random.Random(seed)
+    directions = [rng.choice(tuple(projectUtil.MOVES)) for _ in range(moves)]
+    game = projectUtil.MazeGame(grid, (1, 1), (0, 0))
+    t0 = time.perf_counter()
+    game.run(directions)
+    elapsed = time.perf_counter() - t0
+    return {'N': N, 'moves': moves, 'seconds': elapsed, 'moves_per_second': moves / elapsed, 'steps': game.steps}
+
+def bench_crowd(N=100, agents=10000, steps=200, seed=0):
+    # MazeCrowd.step_all on random directions; the directions are drawn before the clock starts.
+    S = 2 * N + 1
+    grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, 'backtracker', seed), S)
+    crowd = projectUtil.MazeCrowd.scatter(grid, agents, (0, 0), seed)
+    rng = projectUtil.np.random.default_rng(seed) if projectUtil.np is not None else random.Random(seed)
+    directions = [crowd.random_directions(rng) for _ in range(steps)]
+    moved = 0
+    t0 = time.perf_counter()
+    for d in directions: moved += crowd.step_all(d)
+    elapsed = time.perf_counter() - t0
+    return {'N': N, 'agents': agents, 'steps': steps, 'seconds': elapsed,
+            'agent_moves_per_second': agents * steps / elapsed, 'moved': moved}
+
+def bench_replay(N=25, replays=2000, seeds=20, seed=0):
+    # Shortest-route runs recorded as Timed replays over a few mazes, as a leaderboard would hold
+    # them; times encode + decode and verification, which regenerates each maze once.
+    S = 2 * N + 1
+    rng = random.Random(seed)
+    blobs = []
+    for i in range(replays):
+        maze_seed = i % seeds
+        grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, 'backtracker', maze_seed), S)
+        sx, sz = rng.randrange(N), rng.randrange(N)
+        field = projectSolver.DistanceField(grid, S, (S - 2, S - 2))
+        path = field.path_from(2 * sx + 1, 2 * sz + 1)
+        now = 0.0
+        game = projectUtil.MazeGame(grid, path[0], (S - 2, S - 2), 'Timed', 300, 2, lambda: now)
+        game.start()
+        for (x0, z0), (x1, z1) in zip(path, path[1:]):
+            now += 0.25
+            if game.step(_STEP_NAMES[x1 - x0, z1 - z0]) != 'moved': break
+        blobs.append(projectIO.Replay.from_game(game, maze_seed, 'backtracker', (sx, sz)).encode())
+    t0 = time.perf_counter()
+    decoded = [projectIO.Replay.decode(blob) for blob in blobs]
+    decode_elapsed = time.perf_counter() - t0
+    projectCache.MAZES.clear()
+    t0 = time.perf_counter()
+    rejected = sum(problem is not None for _, problem in projectIO.verify_replays(decoded))
+    elapsed = time.perf_counter() - t0
+    return {'N': N, 'replays': replays, 'mean_bytes': sum(map(len, blobs)) / replays, 'decode_seconds': decode_elapsed,
+            'verify_seconds': elapsed, 'replays_per_second': replays / elapsed, 'rejected': rejected}
+
+_STEP_NAMES = {(2, 0): 'right', (-2, 0): 'left', (0, 2): 'down', (0, -2): 'up'}
+
+def bench_solvers(N=projectSolver.MAX_SOLVE_SIZE, algorithm='backtracker', seed=0, methods=('bfs', 'bidirectional')):
+    # Corner-to-corner queries plus the cached distance field the game builds from the finish, at
+    # the largest size the solvers are sized for.
+    # A* is left out by default: on perfect mazes it is the slowest of the three.
+    S = 2 * N + 1
+    grid = projectUtil.generate(N, algorithm, seed)
+    start, goal = (1, 1), (S - 2, S - 2)
+    results = {}
+    for method in methods:
+        t0 = time.perf_counter()
+        path = projectSolver.solve(grid, S, start, goal, method)
+        results[method] = {'seconds': time.perf_counter() - t0, 'length': len(path) - 1}
+    t0 = time.perf_counter()
+    projectSolver.DistanceField(grid, S, goal)
+    results['distance_field'] = {'seconds': time.perf_counter() - t0}
+    return results
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+def bench_file_load(N=1000, algorithm='backtracker', seed=0):
+    # Compact bitset file (header open, one row, full decode) against a JSON dump of M['map'].
+    S = 2 * N + 1
+    grid = projectUtil.generate(N, algorithm, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        maze_path, json_path = os.path.join(tmp, 'maze.maze'), os.path.join(tmp, 'maze.json')
+        projectIO.save_maze(maze_path, grid, N, seed, algorithm)
+        with open(json_path, 'w') as f:
+            json.dump([list(row) for row in projectUtil.grid_rows(grid, S)], f)
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        def open_and_read_row():
+            with projectIO.MazeFile(maze_path) as f:
+                return f.row(N)
+
+        open_seconds, _ = _timed(open_and_read_row)
+        full_seconds, _ = _timed(projectIO.load_maze, maze_path)
+        json_seconds, _ = _timed(load_json)
+        return {
+            'N': N,
+            'compact_bytes': os.path.getsize(maze_path), 'json_bytes': os.path.getsize(json_path),
+            'compact_open_row_seconds': open_seconds, 'compact_full_seconds': full_seconds,
+            'json_seconds': json_seconds,
+        }
+
+def _headless_ui():
+    # projectUI falls back to CmdsStub outside Maya; the UI benches drive it without a dialog.
+    try:
+        from . import projectUI
+    except ImportError:
+        import projectUI
+    if type(projectUI.cmds).__name__ != 'CmdsStub':
+        raise RuntimeError("UI benchmarks need the CmdsStub fallback; run them outside Maya.")
+    return projectUI
+
+
+@contextlib.contextmanager
+def _counting(ui):
+    counter = projectStats.CallCounter(ui.cmds)
+    ui.cmds = counter
+    try:
+        yield counter
+    finally:
+        ui.cmds = counter.target
+
+def _walk(grid, start, moves, seed):
+    # A random walk that never bumps into a wall, so every step takes the full move path.
+    rng = random.Random(seed)
+    x, z = start
+    directions = []
+    for _ in range(moves):
+        name, (dx, dz) = rng.choice([(n, d) for n, d in projectUtil.MOVES.items() if not grid.is_wall(x + d[0], z + d[1])])
+        directions.append(name)
+        x += 2 * dx; z += 2 * dz
+    return directions
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def _build_walls(ui, N, mode, seed):
+    # The build_maze_action wall loop without the dialog: a fresh walls group plus SceneBuild.run().
+    layout = ui.prepare_layout(projectUtil.generate(N, 'backtracker', seed), N, (0, 0), (N - 1, N - 1), mode)
+    ui.resetMaze(clearOnly=True)
+    ui.M['map'] = layout['map']
+    ui.M['walls_group'] = ui.cmds.group(empty=True, name='Maze_Walls_GRP')
+    return layout
+
+def bench_build(N=100, mode='rectangles', seed=0):
+    # First build from an empty scene, then the same layout again, which the diff turns into a no-op.
+    ui = _headless_ui()
+    layout = _build_walls(ui, N, mode, seed)
+    with _counting(ui) as counter:
+        t0 = time.perf_counter()
+        ui.SceneBuild(layout['plan'], mode).run()
+        elapsed = time.perf_counter() - t0
+    with _counting(ui) as rebuild:
+        t0 = time.perf_counter()
+        ui.SceneBuild(layout['plan'], mode).run()
+        rebuild_elapsed = time.perf_counter() - t0
+    ui.resetMaze(clearOnly=True)
+    return {'N': N, 'mode': mode, 'nodes': len(layout['plan']), 'seconds': elapsed, 'calls': counter.total,
+            'calls_by_command': dict(counter.calls), 'rebuild_seconds': rebuild_elapsed, 'rebuild_calls': rebuild.total}
+
+def bench_move_player(N=100, moves=2000, seed=0):
+    # Per-step latency of the UI move path (engine step, scene move, chunk visibility) on a built scene.
+    ui = _headless_ui()
+    layout = _build_walls(ui, N, 'rectangles', seed)
+    ui.SceneBuild(layout['plan'], 'rectangles').run()
+    grid = layout['map']
+    directions = _walk(grid, (1, 1), moves, seed)
+    ui.M['player'] = 'playerBall'
+    ui.M['game'] = projectUtil.MazeGame(grid, (1, 1), (0, 0))
+    ui.update_chunk_visibility(1, 1, force=True)
+    samples = []
+    with _counting(ui) as counter:
+        for direction in directions:
+            t0 = time.perf_counter()
+            ui.move_player(direction)
+            samples.append(time.perf_counter() - t0)
+    ui.resetMaze(clearOnly=True)
+    return {'N': N, 'moves': moves, 'mean_us': sum(samples) / moves * 1e6, 'p50_us': percentile(samples, 0.5) * 1e6,
+            'p99_us': percentile(samples, 0.99) * 1e6, 'calls_per_step': counter.total / moves}
+
+def bench_reset(N=100, mode='rectangles', seed=0):
+    ui = _headless_ui()
+    layout = _build_walls(ui, N, mode, seed)
+    ui.SceneBuild(layout['plan'], mode).run()
+    with _counting(ui) as counter:
+        t0 = time.perf_counter()
+        ui.resetMaze(clearOnly=True)
+        elapsed = time.perf_counter() - t0
+    return {'N': N, 'mode': mode, 'seconds': elapsed, 'calls': counter.total}
+
+def _cold(fn):
+    # fn with the maze cache emptied before each call, so seeded generation is measured, not a hit.
+    def run(*args):
+        projectCache.MAZES.clear()
+        return fn(*args)
+    return run
+
+def bench_cache(N=100, mode='rectangles', seed=0, difficulty=0.5):
+    # prepare_maze (generate, place finish, solve, mesh) on an empty cache, again on the warm memory
+    # tier, then from the disk tier in a fresh cache, as after a restart.
+    ui = _headless_ui()
+    shared = projectCache.MAZES
+    results = {'N': N, 'mode': mode}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('cold', 'warm', 'disk'):
+                if name != 'warm': projectCache.MAZES = projectCache.MazeCache(directory=directory)
+                t0 = time.perf_counter()
+                ui.prepare_maze(N, 'backtracker', seed, (0, 0), difficulty, mode)
+                results[f'{name}_seconds'] = time.perf_counter() - t0
+            results['entry_bytes'] = projectCache.MAZES.stats()['bytes']
+    finally:
+        projectCache.MAZES = shared
+    results['speedup'] = results['cold_seconds'] / results['warm_seconds']
+    return results
+
+def bench_tick(ticks=100000):
+    # The game-clock path the dialog's QTimer polls every CLOCK_REFRESH_MS.
+    grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(5, 'backtracker', 0), 11)
+    game = projectUtil.MazeGame(grid, (1, 1), (0, 0), 'Timed', ticks + 1)
+    game.start()
+    t0 = time.perf_counter()
+    for _ in range(ticks): game.tick()
+    elapsed = time.perf_counter() - t0
+    return {'ticks': ticks, 'mean_us': elapsed / ticks * 1e6}
+
+def _fresh_python(code):
+    # Runs code in a new interpreter beside these modules, so imports are timed cold; code prints
+    # its result as JSON on the last line. Qt gets the offscreen platform unless one is set.
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    out = subprocess.run([sys.executable, '-c', code], cwd=_HERE, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench_import(module='projectUI'):
+    # Cold import time, and whether the import pulled in Qt (it should not for any module here).
+    return _fresh_python(
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - t0\n"
+        "qt = any(name.split('.')[0] in ('PySide6', 'PySide2') for name in sys.modules)\n"
+        "print(json.dumps({'seconds': elapsed, 'qt_imported': qt}))\n")
+
+def bench_first_show():
+    # Qt import, then the dialog's first construct-and-show and a second one in the same process
+    # (cached pixmap, warm Qt). None when PySide is not installed.
+    return _fresh_python(
+        "import json, time\n"
+        "import projectUI\n"
+        "t0 = time.perf_counter()\n"
+        "try:\n"
+        "    projectUI.load_qt()\n"
+        "except ImportError:\n"
+        "    print('null'); raise SystemExit\n"
+        "app = projectUI.QtWidgets.QApplication([])\n"
+        "t1 = time.perf_counter()\n"
+        "shows = []\n"
+        "for _ in range(2):\n"
+        "    t = time.perf_counter()\n"
+        "    dialog = projectUI.MazeConfigDialog(); dialog.show(); app.processEvents()\n"
+        "    shows.append(time.perf_counter() - t)\n"
+        "    dialog.close(); app.processEvents()\n"
+        "print(json.dumps({'qt_import_seconds': t1 - t0, 'first_show_seconds': shows[0], 'reshow_seconds': shows[1]}))\n")
+
+def _keep_best(best, result):
+    # Merges one run into the best so far, metric by metric: the lowest time, the highest
+    # throughput. Deterministic metrics come out the same on every run.
+    if best is None: return dict(result)
+    for key, value in result.items():
+        old = best.get(key)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)): continue
+        best[key] = max(old, value) if key in HIGHER_IS_BETTER else min(old, value)
+    return best
+
+def _generation(fn, *args):
+    elapsed, peak = _measure(fn, *args)
+    return {'seconds': elapsed, 'peak_bytes': peak}
+
+def run_suite(sizes=(25, 100, 250), build_sizes=(25, 100), moves=2000, repeats=5):
+    # Flat {name: metrics} so runs can be saved as JSON and compared metric by metric. The whole
+    # suite runs `repeats` times and each metric keeps its best value, so neither one descheduled
+    # run nor a slow stretch of the machine reads as a regression.
+    ui = _headless_ui()
+    benches = [(f'generateMaze/N={N}', _generation, (_cold(ui.generateMaze), N, 0)) for N in sizes]
+    for N in build_sizes:
+        benches += [(f'build/{mode}/N={N}', bench_build, (N, mode)) for mode in ('cubes', 'rectangles', 'combined')]
+        benches += [(f'move_player/N={N}', bench_move_player, (N, moves)), (f'resetMaze/N={N}', bench_reset, (N,))]
+    benches += [('tick', bench_tick, ()), ('crowd/N=100', bench_crowd, ()), ('replay/N=25', bench_replay, ()),
+                ('cache/N=100', bench_cache, ())]
+    benches += [(f'import/{module}', bench_import, (module,)) for module in ('projectUtil', 'projectUI')]
+    benches.append(('first_show', bench_first_show, ()))
+    results = {}
+    for _ in range(repeats):
+        for name, fn, args in benches:
+            result = fn(*args)
+            if result: results[name] = _keep_best(results.get(name), result)
+    return results
+
+# Stub call and node counts are deterministic, so any increase is a regression; timings get slack.
+EXACT_METRICS = ('nodes', 'calls', 'rebuild_calls', 'calls_per_step', 'qt_imported', 'rejected')
+# Throughputs regress when they drop. Workload metrics describe what ran, not how fast, and are skipped.
+HIGHER_IS_BETTER = ('agent_moves_per_second', 'replays_per_second', 'speedup')
+WORKLOAD_METRICS = ('N', 'moved')
+# Timing changes smaller than this are timer and scheduler noise whatever the ratio (a 30 us
+# rebuild taking 45 us): whole-run timings are in seconds, per-call means and percentiles in us.
+NOISE_FLOOR_SECONDS = 0.001
+NOISE_FLOOR_US = 1.0
+
+def _noise_floor(key):
+    if key.endswith('seconds'): return NOISE_FLOOR_SECONDS
+    if key.endswith('_us'): return NOISE_FLOOR_US
+    return 0
+
+def compare(results, baseline, tolerance=0.25):
+    regressions = []
+    for name, metrics in results.items():
+        old = baseline.get(name)
+        if not old: continue
+        for key, value in metrics.items():
+            before = old.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or key in WORKLOAD_METRICS: continue
+            if key in HIGHER_IS_BETTER: worse = value < before / (1 + tolerance)
+            else: worse = value > (before if key in EXACT_METRICS else before * (1 + tolerance))
+            if worse and abs(value - before) > _noise_floor(key):
+                regressions.append(f"{name} {key}: {before:.6g} -> {value:.6g}")
+    return regressions
+
+def print_results(title, results):
+    print(title)
+    for r in results:
+        print(f"  N={r['N']:<6} {r['seconds'] * 1000:10.1f} ms  {r['peak_bytes'] / (1 << 20):9.2f} MiB peak")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maze benchmarks. The default run covers the engine only; "
+                                                 "--suite adds the headless UI paths on CmdsStub.")
+    parser.add_argument('sizes', type=int, nargs='*', help="maze sizes for generation (default 25 500 5000)")
+    parser.add_argument('--suite', action='store_true', help="run the JSON benchmark suite instead")
+    parser.add_argument('--json', metavar='PATH', help="write suite results to PATH")
+    parser.add_argument('--baseline', metavar='PATH', help="compare suite results against a saved run")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown for timings (default 0.25)")
+    parser.add_argument('--repeats', type=int, default=5, help="suite passes, best value per metric kept (default 5)")
+    args = parser.parse_args(argv)
+
+    if not (args.suite or args.json or args.baseline):
+        sizes = tuple(args.sizes) or (25, 500, 5000)
+        for algorithm in projectUtil.ALGORITHMS:
+            print_results(f'generateMaze ({algorithm})', bench_generation(sizes, algorithm))
+        for method, r in bench_solvers().items():
+            print(f"solver {method:<15} {r['seconds'] * 1000:10.1f} ms")
+        r = bench_file_load()
+        print(f"load N={r['N']}: compact {r['compact_bytes']} B, open+row {r['compact_open_row_seconds'] * 1000:.2f} ms, "
+              f"full {r['compact_full_seconds'] * 1000:.1f} ms | json {r['json_bytes']} B, {r['json_seconds'] * 1000:.1f} ms")
+        r = bench_moves()
+        print(f"MazeGame.step: {r['moves']} moves in {r['seconds']:.3f}s ({r['moves_per_second'] / 1e6:.2f} M moves/s)")
+        r = bench_crowd()
+        print(f"MazeCrowd.step_all: {r['agents']} agents x {r['steps']} steps in {r['seconds']:.3f}s "
+              f"({r['agent_moves_per_second'] / 1e6:.2f} M agent-moves/s)")
+        r = bench_replay()
+        print(f"replay verify: {r['replays']} replays ({r['mean_bytes']:.0f} B each) in {r['verify_seconds']:.3f}s "
+              f"({r['replays_per_second']:.0f}/s), {r['rejected']} rejected")
+        r = bench_cache()
+        print(f"prepare_maze N={r['N']}: cold {r['cold_seconds'] * 1000:.1f} ms, warm {r['warm_seconds'] * 1000:.2f} ms "
+              f"({r['speedup']:.0f}x), from disk {r['disk_seconds'] * 1000:.1f} ms, {r['entry_bytes'] / 1024:.0f} KiB cached")
+        r = bench_import()
+        print(f"import projectUI: {r['seconds'] * 1000:.1f} ms cold ({'with' if r['qt_imported'] else 'without'} Qt)")
+        r = bench_first_show()
+        if r:
+            print(f"dialog: Qt import {r['qt_import_seconds'] * 1000:.1f} ms, first show {r['first_show_seconds'] * 1000:.1f} ms, "
+                  f"reshow {r['reshow_seconds'] * 1000:.1f} ms")
+        return 0
+
+    results = run_suite(tuple(args.sizes) or (25, 100, 250), repeats=args.repeats)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=1, sort_keys=True))
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions: return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+import collections
+import itertools
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+try:
+    from . import projectUtil, projectSolver, projectIO
+except ImportError:
+    import projectUtil
+    import projectSolver
+    import projectIO
+
+# Generated mazes and the work derived from them, keyed by (N, seed, algorithm): the grid, its wall
+# meshings (one per name, e.g. build mode) and its distance fields (one per source cell). Entries
+# are kept in LRU order and the least recently used are evicted once the estimated total passes
+# max_bytes. With a directory, each persistent entry is also written there whenever it gains
+# data, so a restart, or another process, starts warm; files not used for longest are deleted once
+# the directory passes disk_max_bytes. MAZE_CACHE_DIR turns the disk tier on for the shared MAZES
+# cache.
+#
+# An entry file is a projectIO .maze file followed by a trailer with the derived data, all plain
+# little-endian int32 arrays:
+#
+#   magic 'MZCX', CACHE_VERSION, field count, mesh count, then per field the source x/z, the cell
+#   count and the distances, and per mesh the mode (16 bytes, NUL padded), chunk size, item count
+#   and a combined flag, then the boxes as x/z/width/depth, or per combined chunk its cx/cz, cell
+#   hash (16 bytes) and strip count followed by the strip boxes.
+
+CACHE_VERSION = 2 # bump whenever generation or meshing output changes; older files are then ignored
+DEFAULT_MAX_BYTES = 64 << 20
+DEFAULT_DISK_BYTES = 512 << 20
+BOX_BYTES = 150 # rough in-memory size of one meshed wall box with its plan tuple
+TRAILER_MAGIC = b'MZCX'
+TRAILER = struct.Struct('<4sHII')
+FIELD = struct.Struct('<iiI')
+MESH = struct.Struct('<16sIIB')
+CHUNK = struct.Struct('<ii16sI')
+
+
+def _pack_ints(values):
+    ints = array('i', values)
+    if sys.byteorder == 'big': ints.byteswap()
+    return ints.tobytes()
+
+def _unpack_ints(data, offset, count):
+    end = offset + 4 * count
+    if end > len(data): raise ValueError("Truncated cache entry")
+    ints = array('i')
+    ints.frombytes(data[offset:end])
+    if sys.byteorder == 'big': ints.byteswap()
+    return ints, end
+
+def _boxes(ints):
+    # (x, z, width, depth) tuples from a flat run of ints.
+    it = iter(ints)
+    return zip(it, it, it, it)
+
+def _pack_derived(fields, meshes):
+    # Meshes are only written when named (mode, chunk size), as projectUI names them.
+    meshes = {name: plan for name, plan in meshes.items() if isinstance(name, tuple) and len(name) == 2}
+    parts = [TRAILER.pack(TRAILER_MAGIC, CACHE_VERSION, len(fields), len(meshes))]
+    for (x, z), dist in fields.items():
+        parts += [FIELD.pack(x, z, len(dist)), _pack_ints(dist)]
+    for (mode, chunk), plan in meshes.items():
+        combined = any(strips is not None for _, strips in plan)
+        parts.append(MESH.pack(mode.encode('ascii'), chunk, len(plan), combined))
+        if not combined:
+            parts.append(_pack_ints(itertools.chain.from_iterable(key for key, _ in plan)))
+            continue
+        for (_, cx, cz, digest), strips in plan:
+            parts += [CHUNK.pack(cx, cz, digest, len(strips)), _pack_ints(itertools.chain.from_iterable(strips))]
+    return b''.join(parts)
+
+def _unpack_derived(data):
+    # (fields, meshes) from an entry trailer, or None when it was written by another CACHE_VERSION.
+    magic, version, field_count, mesh_count = TRAILER.unpack_from(data, 0)
+    if magic != TRAILER_MAGIC: raise ValueError("Not a cache entry")
+    if version != CACHE_VERSION: return None
+    offset = TRAILER.size
+    fields, meshes = {}, {}
+    for _ in range(field_count):
+        x, z, count = FIELD.unpack_from(data, offset)
+        fields[(x, z)], offset = _unpack_ints(data, offset + FIELD.size, count)
+    for _ in range(mesh_count):
+        mode, chunk, count, combined = MESH.unpack_from(data, offset)
+        offset += MESH.size
+        if not combined:
+            boxes, offset = _unpack_ints(data, offset, 4 * count)
+            plan = [(box, None) for box in _boxes(boxes)]
+        else:
+            plan = []
+            for _ in range(count):
+                cx, cz, digest, strip_count = CHUNK.unpack_from(data, offset)
+                boxes, offset = _unpack_ints(data, offset + CHUNK.size, 4 * strip_count)
+                plan.append((('combined', cx, cz, digest), list(_boxes(boxes))))
+        meshes[(mode.rstrip(b'\x00').decode('ascii'), chunk)] = plan
+    return fields, meshes
+
+
+class CacheEntry:
+    # meshes hold projectUI.mesh_walls plans, fields projectSolver.distance_field tables. Entries
+    # that are not persistent stay in memory only.
+    __slots__ = ('key', 'grid', 'meshes', 'fields', 'nbytes', 'persistent')
+
+    def __init__(self, key, grid, meshes=None, fields=None, persistent=True):
+        self.key = key
+        self.grid = grid
+        self.persistent = persistent
+        self.meshes = meshes or {}
+        self.fields = fields or {}
+        self.nbytes = self.measure()
+
+    def measure(self):
+        size = self.grid.nbytes
+        for plan in self.meshes.values():
+            size += BOX_BYTES * sum(1 if strips is None else 1 + len(strips) for _, strips in plan)
+        for dist in self.fields.values():
+            size += len(dist) * dist.itemsize
+        return size
+
+
+class MazeCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None, disk_max_bytes=DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.entries = collections.OrderedDict()
+        self.nbytes = 0
+        self.counters = collections.Counter()
+        self.lock = threading.Lock() # builds run on a worker thread, the game server on an executor
+
+    def lookup(self, N, seed, algorithm='backtracker'):
+        # The entry from memory or disk, or None; never generates.
+        key = (N, seed, algorithm)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry
+        entry = self._load(key)
+        if entry is not None:
+            with self.lock:
+                self.counters['disk_hits'] += 1
+                return self._insert(entry)
+        with self.lock:
+            self.counters['misses'] += 1
+        return None
+
+    def entry(self, N, seed, algorithm='backtracker', persistent=True):
+        # Like lookup, but generates the maze on a miss. Unseeded mazes are never repeated, so they
+        # get an entry of their own that is not kept. persistent=False keeps a new entry off disk,
+        # e.g. for a seed picked at random, until a persistent request for it comes in.
+        if seed is None:
+            return CacheEntry((N, seed, algorithm), projectUtil.MazeGrid.from_cells(projectUtil.generate(N, algorithm), 2 * N + 1))
+        entry = self.lookup(N, seed, algorithm)
+        if entry is None:
+            grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, algorithm, seed), 2 * N + 1)
+            created = CacheEntry((N, seed, algorithm), grid, persistent=persistent)
+            self._save(created)
+            with self.lock:
+                entry = self._insert(created)
+        if persistent and not entry.persistent:
+            entry.persistent = True
+            self._save(entry)
+        return entry
+
+    def grid(self, N, seed, algorithm='backtracker'):
+        return self.entry(N, seed, algorithm).grid
+
+    def distances(self, entry, source):
+        # projectSolver.DistanceField to map cell `source`, solved once per entry.
+        dist = entry.fields.get(source)
+        if dist is None:
+            dist = projectSolver.distance_field(entry.grid, entry.grid.S, source)
+            self._grow(entry, entry.fields, source, dist, 'field_misses')
+        else:
+            with self.lock: self.counters['field_hits'] += 1
+        return projectSolver.DistanceField(entry.grid, entry.grid.S, source, dist)
+
+    def mesh(self, entry, name, build):
+        # build(grid) once per entry and name. The result is shared: callers must not modify it.
+        plan = entry.meshes.get(name)
+        if plan is None:
+            plan = build(entry.grid)
+            self._grow(entry, entry.meshes, name, plan, 'mesh_misses')
+        else:
+            with self.lock: self.counters['mesh_hits'] += 1
+        return plan
+
+    def clear(self):
+        # Empties the memory tier; files on disk stay.
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries), bytes=self.nbytes, max_bytes=self.max_bytes)
+
+    def report(self):
+        s = self.stats()
+        return (f"maze cache: {s['entries']} mazes, {s['bytes'] / (1 << 20):.1f}/{s['max_bytes'] / (1 << 20):.0f} MiB; "
+                f"hits {s.get('hits', 0)}, disk {s.get('disk_hits', 0)}, misses {s.get('misses', 0)}, "
+                f"evicted {s.get('evictions', 0)} (disk {s.get('disk_evictions', 0)}); meshes {s.get('mesh_hits', 0)}/{s.get('mesh_hits', 0) + s.get('mesh_misses', 0)}, "
+                f"fields {s.get('field_hits', 0)}/{s.get('field_hits', 0) + s.get('field_misses', 0)} cached")
+
+    def _insert(self, entry):
+        # Caller holds the lock. A concurrent miss on the same key may have inserted first; keep that one.
+        current = self.entries.get(entry.key)
+        if current is not None:
+            self.entries.move_to_end(entry.key)
+            return current
+        self.entries[entry.key] = entry
+        self.nbytes += entry.nbytes
+        self._evict()
+        return entry
+
+    def _grow(self, entry, table, name, value, counter):
+        with self.lock:
+            self.counters[counter] += 1
+            table[name] = value
+            size = entry.measure()
+            if self.entries.get(entry.key) is entry: self.nbytes += size - entry.nbytes
+            entry.nbytes = size
+            self._evict()
+        self._save(entry)
+
+    def _evict(self):
+        # The newest entry always stays, even when it alone is over budget.
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.nbytes -= entry.nbytes
+            self.counters['evictions'] += 1
+
+    def _path(self, key):
+        N, seed, algorithm = key
+        return os.path.join(self.directory, f'{algorithm}_{N}_{seed}.maze')
+
+    def _load(self, key):
+        if not self.directory: return None
+        path = self._path(key)
+        try:
+            with projectIO.MazeFile(path) as f:
+                if (f.N, f.seed, f.algorithm) != key: raise ValueError(f"Cache entry for another maze: {path}")
+                grid, trailer = f.grid(), f.trailer()
+            derived = _unpack_derived(trailer)
+            if derived is None: return None
+            os.utime(path) # most recently used, for the disk budget
+            fields, meshes = derived
+            return CacheEntry(key, grid, meshes, fields)
+        except FileNotFoundError:
+            return None
+        except Exception: # a damaged or foreign file is just a miss
+            with self.lock: self.counters['disk_errors'] += 1
+            return None
+
+    def _save(self, entry):
+        # Written to a temporary file and renamed into place, so readers never see half an entry.
+        N, seed, algorithm = entry.key
+        if not self.directory or seed is None or not entry.persistent: return
+        tmp = None
+        try:
+            with self.lock:
+                trailer = _pack_derived(dict(entry.fields), dict(entry.meshes))
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(fd)
+            projectIO.save_maze(tmp, entry.grid, N, seed, algorithm)
+            with open(tmp, 'ab') as f:
+                f.write(trailer)
+            os.replace(tmp, self._path(entry.key))
+            tmp = None
+            self._trim_disk(self._path(entry.key))
+        except (OSError, ValueError, struct.error): # e.g. a seed or size the .maze header cannot hold
+            with self.lock: self.counters['disk_errors'] += 1
+        finally:
+            if tmp is not None:
+                try: os.remove(tmp)
+                except OSError: pass
+
+    def _trim_disk(self, keep):
+        # Deletes the least recently used entry files until the directory fits disk_max_bytes; the
+        # file just written always stays.
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.maze'): continue
+            path = os.path.join(self.directory, name)
+            try: st = os.stat(path)
+            except OSError: continue # removed by another process meanwhile
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes: break
+            if path == keep: continue
+            try: os.remove(path)
+            except OSError: continue
+            total -= size
+            with self.lock: self.counters['disk_evictions'] += 1
+
+MAZES = MazeCache(directory=os.environ.get('MAZE_CACHE_DIR') or None)
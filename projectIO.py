@@ -0,0 +1,244 @@
+import mmap
+import struct
+
+try:
+    from . import projectUtil, projectCache
+except ImportError:
+    import projectUtil
+    import projectCache
+
+# Compact maze file: a fixed header followed by the S x S wall map at one bit per cell.
+# Each row is padded to whole bytes so any row can be read on its own straight from the mmap.
+#
+#   magic 'MAZE', version, flags (bit 0: seed present), N, seed, algorithm (16 bytes, NUL padded),
+#   start x/z and finish x/z as cell coordinates (-1 when unset), then rows, bit x of a row = cell x.
+
+MAGIC = b'MAZE'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQ16siiii')
+FLAG_SEED = 1
+
+
+def _pack_header(N, seed, algorithm, start, finish):
+    sx, sz = start if start is not None else (-1, -1)
+    fx, fz = finish if finish is not None else (-1, -1)
+    flags = FLAG_SEED if seed is not None else 0
+    return HEADER.pack(MAGIC, VERSION, flags, N, seed or 0, algorithm.encode('ascii'), sx, sz, fx, fz)
+
+def write_maze_rows(path, rows, N, seed=None, algorithm='backtracker', start=None, finish=None):
+    # Streams any iterable of map rows (e.g. projectUtil.stream_rows) into the compact format.
+    with open(path, 'wb') as f:
+        f.write(_pack_header(N, seed, algorithm, start, finish))
+        for row in rows:
+            f.write(projectUtil.pack_row(row))
+
+def save_maze(path, grid, N, seed=None, algorithm='backtracker', start=None, finish=None):
+    # grid is a projectUtil.MazeGrid, written as-is, or a flat 0/1 bytearray, packed row by row.
+    if isinstance(grid, projectUtil.MazeGrid):
+        with open(path, 'wb') as f:
+            f.write(_pack_header(N, seed, algorithm, start, finish))
+            f.write(grid.bits)
+        return
+    S = 2 * N + 1
+    write_maze_rows(path, (grid[i:i + S] for i in range(0, S * S, S)), N, seed, algorithm, start, finish)
+
+
+class MazeFile:
+    # Read-only, memory-mapped view of a saved maze. Opening only parses the header; rows are
+    # decoded on demand, so even very large mazes open instantly.
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty maze file: {path}") from None
+        try:
+            self._read_header(path)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self, path):
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"Truncated maze file: {path}")
+        magic, version, flags, N, seed, algorithm, sx, sz, fx, fz = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a maze file: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported maze file version {version}: {path}")
+        self.N = N
+        self.S = 2 * N + 1
+        self.seed = seed if flags & FLAG_SEED else None
+        self.algorithm = algorithm.rstrip(b'\x00').decode('ascii')
+        self.start = (sx, sz) if sx >= 0 else None
+        self.finish = (fx, fz) if fx >= 0 else None
+        self.row_bytes = projectUtil.row_bytes(self.S)
+        if len(self._map) < HEADER.size + self.S * self.row_bytes:
+            raise ValueError(f"Truncated maze file: {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def raw_row(self, z):
+        offset = HEADER.size + z * self.row_bytes
+        return self._map[offset:offset + self.row_bytes]
+
+    def row(self, z):
+        return projectUtil.unpack_row(self.raw_row(z), self.S)
+
+    def is_wall(self, x, z):
+        return (self._map[HEADER.size + z * self.row_bytes + (x >> 3)] >> (x & 7)) & 1
+
+    def rows(self):
+        for z in range(self.S):
+            yield self.row(z)
+
+    def grid(self):
+        # The on-disk rows already are MazeGrid's layout, so this is a single copy, no decoding.
+        return projectUtil.MazeGrid(self.S, self._map[HEADER.size:HEADER.size + self.S * self.row_bytes])
+
+    def trailer(self):
+        # Whatever follows the rows; readers of the maze ignore it (projectCache keeps derived data there).
+        return self._map[HEADER.size + self.S * self.row_bytes:]
+
+def load_maze(path):
+    # Whole-maze convenience loader: returns (MazeGrid, N, seed, algorithm, start, finish).
+    with MazeFile(path) as f:
+        return f.grid(), f.N, f.seed, f.algorithm, f.start, f.finish
+
+
+# Replay: a game reduced to what is needed to play it again. The maze is regenerated from its
+# seed, so a run costs a fixed header plus 2 bits per move.
+#
+#   magic 'MZRP', version, algorithm id (REPLAY_ALGORITHMS index), mode (REPLAY_MODES index), N,
+#   seed, start x/z and finish x/z as cell coordinates, time limit, step penalty and elapsed clock
+#   time in seconds, step count, outcome (REPLAY_OUTCOMES index), then the moves as MOVE_CODES
+#   indices, four to a byte, first move in the low bits.
+
+REPLAY_MAGIC = b'MZRP'
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct('<4sHBBIQiiiidddIB')
+REPLAY_ALGORITHMS = ('backtracker', 'binary_tree', 'sidewinder', 'eller') # ids are stored; append only
+REPLAY_MODES = ('Normal', 'Timed')
+REPLAY_OUTCOMES = (None, 'win', 'timeout') # None: the run was abandoned
+
+
+def pack_moves(moves):
+    data = bytearray((len(moves) + 3) // 4)
+    for i, code in enumerate(moves):
+        data[i >> 2] |= code << ((i & 3) << 1)
+    return bytes(data)
+
+def unpack_moves(data, count):
+    return bytes((data[i >> 2] >> ((i & 3) << 1)) & 3 for i in range(count))
+
+
+class Replay:
+    # One recorded run. moves holds MOVE_CODES indices, one byte each in memory; start and finish
+    # are cell coordinates; elapsed is clock time spent playing, pauses and penalties excluded.
+    __slots__ = ('N', 'seed', 'algorithm', 'mode', 'start', 'finish', 'time_limit', 'penalty',
+                 'elapsed', 'outcome', 'moves')
+
+    def __init__(self, N, seed, algorithm, start, finish, moves, mode='Normal', time_limit=0, penalty=0,
+                 elapsed=0.0, outcome=None):
+        if algorithm not in REPLAY_ALGORITHMS:
+            raise ValueError(f"Unknown maze algorithm: {algorithm}")
+        self.N, self.seed, self.algorithm = N, seed, algorithm
+        self.start, self.finish = tuple(start), tuple(finish)
+        self.moves = bytes(moves)
+        self.mode, self.time_limit, self.penalty = mode, time_limit, penalty
+        self.elapsed, self.outcome = elapsed, outcome
+
+    @classmethod
+    def from_game(cls, game, seed, algorithm, start):
+        # Records a projectUtil.MazeGame played on projectUtil.generate(N, algorithm, seed).
+        return cls(game.S // 2, seed, algorithm, start, (game.fx // 2, game.fz // 2), game.moves, game.mode,
+                   game.time_limit, game.penalty, game.elapsed, game.result)
+
+    @property
+    def steps(self):
+        return len(self.moves)
+
+    def encode(self):
+        (sx, sz), (fx, fz) = self.start, self.finish
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, REPLAY_ALGORITHMS.index(self.algorithm),
+                                    REPLAY_MODES.index(self.mode), self.N, self.seed, sx, sz, fx, fz,
+                                    self.time_limit, self.penalty, self.elapsed, self.steps,
+                                    REPLAY_OUTCOMES.index(self.outcome))
+        return header + pack_moves(self.moves)
+
+    @classmethod
+    def decode(cls, data, name='replay'):
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError(f"Truncated replay: {name}")
+        (magic, version, algorithm, mode, N, seed, sx, sz, fx, fz, time_limit, penalty, elapsed, steps,
+         outcome) = REPLAY_HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"Not a replay: {name}")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version {version}: {name}")
+        if algorithm >= len(REPLAY_ALGORITHMS) or mode >= len(REPLAY_MODES) or outcome >= len(REPLAY_OUTCOMES):
+            raise ValueError(f"Corrupt replay header: {name}")
+        if len(data) < REPLAY_HEADER.size + (steps + 3) // 4:
+            raise ValueError(f"Truncated replay: {name}")
+        moves = unpack_moves(memoryview(data)[REPLAY_HEADER.size:], steps)
+        return cls(N, seed, REPLAY_ALGORITHMS[algorithm], (sx, sz), (fx, fz), moves, REPLAY_MODES[mode],
+                   time_limit, penalty, elapsed, REPLAY_OUTCOMES[outcome])
+
+def save_replay(path, replay):
+    with open(path, 'wb') as f:
+        f.write(replay.encode())
+
+def load_replay(path):
+    with open(path, 'rb') as f:
+        return Replay.decode(f.read(), path)
+
+
+def replay_grid(replay):
+    # Replays of one seed share a cached grid, so a batch regenerates each distinct maze only once.
+    return projectCache.MAZES.grid(replay.N, replay.seed, replay.algorithm)
+
+def verify_replay(replay, grid=None):
+    # Plays the replay back headless on the regenerated maze. Returns None when every move is legal
+    # and the run ends exactly as recorded, with the recorded step count and outcome, otherwise
+    # what differs. The clock is simulated: it stands still until the last move, which happens at
+    # the recorded elapsed time, so timed outcomes replay exactly as _tick_timer saw them.
+    if grid is None: grid = replay_grid(replay)
+    N = replay.N
+    (sx, sz), (fx, fz) = replay.start, replay.finish
+    if not (0 <= sx < N and 0 <= sz < N and 0 <= fx < N and 0 <= fz < N):
+        return "start or finish outside the maze"
+    now = 0.0
+    game = projectUtil.MazeGame(grid, (2 * sx + 1, 2 * sz + 1), (2 * fx + 1, 2 * fz + 1), replay.mode,
+                                replay.time_limit, replay.penalty, lambda: now)
+    if replay.mode == 'Timed': game.start()
+
+    step, names, last = game.step, projectUtil.MOVE_CODES, replay.steps - 1
+    for i, code in enumerate(replay.moves):
+        if i == last: now = replay.elapsed
+        result = step(names[code])
+        if result in ('wall', 'boundary'):
+            return f"move {i + 1} of {replay.steps} ({names[code]}) is blocked"
+        if result != 'moved' and i != last:
+            return f"game ended ({result}) at move {i + 1} of {replay.steps}"
+    now = replay.elapsed
+    if game.running: game.tick()
+
+    if game.result != replay.outcome:
+        return f"outcome {game.result} does not match the recorded {replay.outcome}"
+    return None
+
+def verify_replays(replays):
+    # Yields (replay, problem) for each replay.
+    for replay in replays:
+        yield replay, verify_replay(replay)
@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+try:
+    from . import projectUtil, projectSolver, projectCache, projectBench
+except ImportError:
+    import projectUtil
+    import projectSolver
+    import projectCache
+    import projectBench
+
+# Local game server: one process, many concurrent maze sessions. Each session is a headless
+# projectUtil.MazeGame, so the dialog's global M and its singleton play no part here. Clients speak
+# newline-delimited JSON over TCP and may run any number of sessions on one connection:
+#
+#   {"op": "new", "id": 1, "N": 25, "seed": 7}   -> {"id": 1, "session": 3, "seed": 7, "start": [0, 0], "finish": [..]}
+#       optional: algorithm, start [x, z], difficulty (0..1), mode ('Normal' / 'Timed'), time_limit
+#   {"op": "move", "id": 2, "session": 3, "dir": "up"}   -> {"id": 2, "result": "moved", "pos": [x, z], "steps": 1}
+#   {"op": "tick", "id": 3, "session": 3}   -> {"id": 3, "result": "running", "time_left": 41.5}
+#   {"op": "end", "id": 4, "session": 3}   -> {"id": 4, "steps": 12, "outcome": "win"}
+#   {"op": "stats", "id": 5}   -> server counters
+#
+# Positions are cell coordinates; errors come back as {"id": .., "error": ".."}. Sessions with the
+# same (N, algorithm, seed) share one MazeGrid. Moves are queued as they arrive and applied in one
+# pass per event-loop turn, and each connection's responses go out in one write per pass. Timed
+# sessions need no server timers: the game clock is a deadline, checked when the client moves or ticks.
+
+DEFAULT_PORT = 8765
+READ_SIZE = 1 << 16
+MOVE_REPLY = '{"id":%s,"result":"%s","pos":[%d,%d],"steps":%d}'
+
+
+class SharedMaze:
+    # One generated maze and the finishes picked on it, shared by every session on that seed. The
+    # grid and distance fields come from projectCache, so a seed played again after its last
+    # session ended is not regenerated.
+    __slots__ = ('key', 'N', 'S', 'seed', 'entry', 'grid', 'finishes', 'refs')
+
+    def __init__(self, N, algorithm, seed):
+        self.key = (N, algorithm, seed)
+        self.N, self.S, self.seed = N, 2 * N + 1, seed
+        self.entry = projectCache.MAZES.entry(N, seed, algorithm)
+        self.grid = self.entry.grid
+        self.finishes = {}
+        self.refs = 0
+
+    def finish(self, start, difficulty):
+        # Same placement as the dialog's prepare_maze, cached per start cell and difficulty.
+        finish = self.finishes.get((start, difficulty), False)
+        if finish is False:
+            dist = projectCache.MAZES.distances(self.entry, (2 * start[0] + 1, 2 * start[1] + 1)).dist
+            finish = self.finishes[start, difficulty] = projectSolver.pick_finish(dist, self.N, difficulty, self.seed)
+        return finish
+
+
+class Session:
+    __slots__ = ('id', 'conn', 'maze', 'game')
+
+    def __init__(self, session_id, conn, maze, game):
+        self.id, self.conn, self.maze, self.game = session_id, conn, maze, game
+
+
+class Connection:
+    # Responses are buffered and written once per pass by GameServer.flush.
+    __slots__ = ('writer', 'out', 'sessions')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.out = []
+        self.sessions = set()
+
+
+class GameServer:
+    def __init__(self, max_size=projectSolver.MAX_SOLVE_SIZE):
+        self.max_size = max_size
+        self.sessions = {}
+        self.mazes = {}
+        self.generating = {}
+        self.pending = []
+        self.dirty = set()
+        self.scheduled = False
+        self.next_id = 1
+        self.counters = {'moves': 0, 'batches': 0, 'sessions_opened': 0, 'mazes_generated': 0}
+
+    async def handle(self, reader, writer):
+        conn = Connection(writer)
+        buffer = b''
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data: break
+                *lines, buffer = (buffer + data).split(b'\n')
+                for line in lines:
+                    if line.strip(): self.dispatch(conn, line)
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in list(conn.sessions): self.end_session(session_id)
+            self.dirty.discard(conn)
+            writer.close()
+
+    def dispatch(self, conn, line):
+        try:
+            request = json.loads(line)
+            op = request['op']
+        except (ValueError, KeyError, TypeError):
+            self.send(conn, {'id': None, 'error': "bad request"})
+            return
+        rid, session_id = request.get('id'), request.get('session')
+        if type(session_id) is not int: session_id = None
+        if op == 'move':
+            direction = request.get('dir')
+            self.pending.append((conn, rid, session_id, direction if type(direction) is str else None))
+            self.schedule()
+        elif op == 'new':
+            asyncio.ensure_future(self.new_session(conn, rid, request))
+        elif op in ('tick', 'end'):
+            session = self.sessions.get(session_id)
+            if session is None or session.conn is not conn:
+                self.send(conn, {'id': rid, 'error': "unknown session"})
+            elif op == 'tick':
+                game = session.game
+                self.send(conn, {'id': rid, 'result': game.tick(), 'time_left': game.time_left})
+            else:
+                game = session.game
+                self.end_session(session.id)
+                self.send(conn, {'id': rid, 'steps': game.steps, 'outcome': game.result})
+        elif op == 'stats':
+            self.send(conn, dict(self.counters, id=rid, sessions=len(self.sessions), mazes=len(self.mazes), cache=projectCache.MAZES.stats()))
+        else:
+            self.send(conn, {'id': rid, 'error': f"unknown op {op!r}"})
+
+    def send(self, conn, message):
+        conn.out.append(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        self.dirty.add(conn)
+        self.schedule()
+
+    def schedule(self):
+        if not self.scheduled:
+            self.scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        # Applies every move queued since the last pass, then writes each connection's responses.
+        self.scheduled = False
+        moves, self.pending = self.pending, []
+        if moves:
+            self.counters['moves'] += len(moves)
+            self.counters['batches'] += 1
+        sessions, dumps, dirty = self.sessions, json.dumps, self.dirty
+        for conn, rid, session_id, direction in moves:
+            session = sessions.get(session_id)
+            if session is None or session.conn is not conn:
+                line = dumps({'id': rid, 'error': "unknown session"})
+            else:
+                game = session.game
+                result = game.step(direction)
+                # Move replies are the bulk of the traffic; formatted directly rather than via json.dumps.
+                line = MOVE_REPLY % (dumps(rid), result, game.x >> 1, game.z >> 1, game.steps)
+            conn.out.append(line.encode() + b'\n')
+            dirty.add(conn)
+        dirty, self.dirty = self.dirty, set()
+        for conn in dirty:
+            if not conn.writer.is_closing(): conn.writer.write(b''.join(conn.out))
+            conn.out.clear()
+
+    async def shared_maze(self, N, algorithm, seed):
+        # Generation runs in the default executor; concurrent requests for one seed share its future.
+        key = (N, algorithm, seed)
+        maze = self.mazes.get(key)
+        if maze is not None: return maze
+        future = self.generating.get(key)
+        if future is None:
+            future = self.generating[key] = asyncio.get_running_loop().run_in_executor(None, SharedMaze, N, algorithm, seed)
+            future.add_done_callback(lambda _: self.generating.pop(key, None))
+            self.counters['mazes_generated'] += 1
+        maze = await future
+        return self.mazes.setdefault(key, maze)
+
+    async def maze_finish(self, maze, start, difficulty):
+        # A new start cell costs a full distance field, which would stall every connection if it ran
+        # on the event loop; like generation it goes to the executor. Known finishes return at once.
+        finish = maze.finishes.get((start, difficulty), False)
+        if finish is not False: return finish
+        return await asyncio.get_running_loop().run_in_executor(None, maze.finish, start, difficulty)
+
+    async def new_session(self, conn, rid, request):
+        try:
+            N = int(request.get('N', 25))
+            algorithm = request.get('algorithm', 'backtracker')
+            seed = request.get('seed')
+            seed = random.randrange(1 << 32) if seed is None else int(seed)
+            start = tuple(request.get('start', (0, 0)))
+            difficulty = float(request.get('difficulty', 1.0))
+            mode = request.get('mode', 'Normal')
+            time_limit = float(request.get('time_limit', 0))
+            if not 1 <= N <= self.max_size: raise ValueError(f"N must be 1..{self.max_size}")
+            if not 0 <= seed < 1 << 64: raise ValueError("seed must be 0..2^64-1")
+            if algorithm not in projectUtil.ALGORITHMS: raise ValueError(f"Unknown maze algorithm: {algorithm}")
+            if mode not in ('Normal', 'Timed'): raise ValueError(f"Unknown mode: {mode}")
+            if mode == 'Timed' and time_limit <= 0: raise ValueError("Timed sessions need a time_limit above 0")
+            if len(start) != 2 or not all(0 <= v < N for v in start): raise ValueError(f"start must be cells 0..{N - 1}")
+            maze = await self.shared_maze(N, algorithm, seed)
+        except (ValueError, TypeError) as e:
+            self.send(conn, {'id': rid, 'error': str(e)})
+            return
+
+        # The reference is taken before the next await and released on every path that opens no
+        # session, so a failed request never leaves an unreferenced maze in self.mazes.
+        maze.refs += 1
+        session = None
+        try:
+            finish = await self.maze_finish(maze, start, difficulty)
+            if finish is None: raise ValueError("maze too small for a finish")
+            if conn.writer.is_closing(): return
+            game = projectUtil.MazeGame(maze.grid, (2 * start[0] + 1, 2 * start[1] + 1), (2 * finish[0] + 1, 2 * finish[1] + 1),
+                                        mode, time_limit)
+            if mode == 'Timed': game.start()
+            session = Session(self.next_id, conn, maze, game)
+        except (ValueError, TypeError) as e:
+            self.send(conn, {'id': rid, 'error': str(e)})
+            return
+        finally:
+            if session is None: self.release_maze(maze)
+        self.next_id += 1
+        self.sessions[session.id] = session
+        conn.sessions.add(session.id)
+        self.counters['sessions_opened'] += 1
+        self.send(conn, {'id': rid, 'session': session.id, 'seed': seed, 'start': list(start), 'finish': list(finish)})
+
+    def end_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None: return
+        session.conn.sessions.discard(session_id)
+        self.release_maze(session.maze)
+
+    def release_maze(self, maze):
+        maze.refs -= 1
+        if maze.refs == 0 and self.mazes.get(maze.key) is maze: del self.mazes[maze.key]
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, ready=None):
+    game_server = GameServer()
+    server = await asyncio.start_server(game_server.handle, host, port)
+    port = server.sockets[0].getsockname()[1]
+    if ready: ready(port)
+    async with server:
+        await server.serve_forever()
+
+
+class Client:
+    # Load-test side of the protocol: requests are matched to responses by id, and writes queued
+    # in the same event-loop turn go out together.
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.waiting = {}
+        self.out = []
+        self.next_id = 0
+        self.task = asyncio.ensure_future(self.read())
+
+    @classmethod
+    async def open(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def read(self):
+        buffer = b''
+        while True:
+            data = await self.reader.read(READ_SIZE)
+            if not data: break
+            *lines, buffer = (buffer + data).split(b'\n')
+            for line in lines:
+                message = json.loads(line)
+                future = self.waiting.pop(message.get('id'), None)
+                if future is not None and not future.done(): future.set_result(message)
+        for future in self.waiting.values(): future.cancel()
+
+    def request(self, message):
+        self.next_id += 1
+        message['id'] = self.next_id
+        future = self.waiting[self.next_id] = asyncio.get_running_loop().create_future()
+        if not self.out: asyncio.get_running_loop().call_soon(self.flush)
+        self.out.append(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        return future
+
+    def flush(self):
+        self.writer.write(b''.join(self.out))
+        self.out.clear()
+
+    async def close(self):
+        self.writer.close()
+        await self.task
+
+
+async def load_test(host, port, sessions=10000, moves=20, connections=64, N=25, seeds=100, seed=0):
+    # Every session random-walks `moves` moves, each sent once the previous answer is back, so all
+    # sessions are in flight at once. Latency is per move, from request to response.
+    clients = [await Client.open(host, port) for _ in range(connections)]
+    t0 = time.perf_counter()
+    opened = await asyncio.gather(*(clients[i % connections].request({'op': 'new', 'N': N, 'seed': i % seeds})
+                                    for i in range(sessions)))
+    setup = time.perf_counter() - t0
+    errors = [m['error'] for m in opened if 'error' in m]
+    if errors: raise RuntimeError(f"{len(errors)} sessions failed to open: {errors[0]}")
+
+    latencies = []
+    names = projectUtil.MOVE_CODES
+
+    async def play(client, session, rng):
+        for _ in range(moves):
+            t = time.perf_counter()
+            await client.request({'op': 'move', 'session': session, 'dir': names[rng.randrange(4)]})
+            latencies.append(time.perf_counter() - t)
+
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(play(clients[i % connections], m['session'], random.Random(rng.getrandbits(32)))
+                           for i, m in enumerate(opened)))
+    elapsed = time.perf_counter() - t0
+    stats = await clients[0].request({'op': 'stats'})
+    for client in clients: await client.close()
+    return {
+        'sessions': sessions, 'connections': connections, 'N': N, 'mazes': stats['mazes'],
+        'setup_seconds': setup, 'moves': len(latencies), 'seconds': elapsed, 'moves_per_second': len(latencies) / elapsed,
+        'p50_ms': projectBench.percentile(latencies, 0.5) * 1000, 'p99_ms': projectBench.percentile(latencies, 0.99) * 1000,
+        'mean_batch': stats['moves'] / max(stats['batches'], 1),
+    }
+
+def _spawn_server():
+    # A server in a child process, so client and server do not share one event loop.
+    proc = subprocess.Popen([sys.executable, __file__, 'serve', '--port', '0'], stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line.startswith('listening'):
+        proc.kill()
+        raise RuntimeError("game server did not start")
+    return proc, int(line.rsplit(':', 1)[1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local maze game server and its load test.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_args = commands.add_parser('serve', help="run the server")
+    serve_args.add_argument('--host', default='127.0.0.1')
+    serve_args.add_argument('--port', type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    load_args = commands.add_parser('loadtest', help="measure moves/s and latency against a server")
+    load_args.add_argument('--host', default='127.0.0.1')
+    load_args.add_argument('--port', type=int, default=None, help="server to test (default: start one)")
+    load_args.add_argument('--sessions', type=int, default=10000)
+    load_args.add_argument('--moves', type=int, default=20, help="moves per session")
+    load_args.add_argument('--connections', type=int, default=64)
+    load_args.add_argument('-n', '--size', type=int, default=25, help="cells per side")
+    load_args.add_argument('--seeds', type=int, default=100, help="distinct mazes shared by the sessions")
+    load_args.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, lambda port: print(f"listening on {args.host}:{port}", flush=True)))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    proc, port = _spawn_server() if args.port is None else (None, args.port)
+    try:
+        r = asyncio.run(load_test(args.host, port, args.sessions, args.moves, args.connections, args.size, args.seeds))
+    finally:
+        if proc: proc.kill(); proc.wait()
+    if args.json:
+        print(json.dumps(r, indent=1))
+    else:
+        print(f"{r['sessions']} sessions on {r['connections']} connections ({r['mazes']} shared mazes, opened in {r['setup_seconds']:.2f}s)")
+        print(f"{r['moves']} moves in {r['seconds']:.2f}s: {r['moves_per_second']:.0f} moves/s, "
+              f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, {r['mean_batch']:.0f} moves per server pass")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,491 @@
+import heapq
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Searches run over the flat S x S map produced by projectUtil.generate (1 = wall); a
+# projectUtil.MazeGrid is accepted too and unpacked for the duration of the search. Positions are
+# map coordinates (x, z) of cells, which sit on odd indices; one step moves two map units.
+# Distance tables are indexed by cell, (z // 2) * N + x // 2, so they hold N^2 entries, not S^2.
+#
+# Sized for mazes up to MAX_SOLVE_SIZE cells per side, the limit the dialog and the game server
+# enforce. There every search and distance field takes well under a second for all algorithms
+# (0.1-0.7 s at N=1000, with or without NumPy). Wide BFS frontiers are expanded with NumPy; narrow
+# ones stay a Python loop at roughly 0.3-0.5 us per cell, and mazes with long corridors
+# (backtracker, eller) keep the frontier narrow, so cost grows with the area: larger mazes still
+# solve, in seconds, but are out of scope. Solve once and reuse the table (DistanceField,
+# projectCache) rather than per query.
+
+MAX_SOLVE_SIZE = 1000
+
+
+def _cells(grid):
+    cells = getattr(grid, 'cells', None)
+    return cells() if cells is not None else grid
+
+def _cell_index(g, S, N):
+    z, x = divmod(g, S)
+    return (z >> 1) * N + (x >> 1)
+
+def _neighbors(grid, g, S):
+    # The border row/column is solid wall, so g +- 1 and g +- S never leave the map.
+    if not grid[g + 1]: yield g + 2
+    if not grid[g - 1]: yield g - 2
+    if not grid[g + S]: yield g + 2 * S
+    if not grid[g - S]: yield g - 2 * S
+
+def _cell(pos, N):
+    return (pos[1] >> 1) * N + (pos[0] >> 1)
+
+def _trace(parent, c, source):
+    path = [c]
+    while c != source:
+        c = parent[c]
+        path.append(c)
+    path.reverse()
+    return path
+
+def _to_coords(path, S):
+    return [(g % S, g // S) for g in path]
+
+def _cell_coords(path, N):
+    return [(2 * (c % N) + 1, 2 * (c // N) + 1) for c in path]
+
+# Open-side bits of open_masks, each with the cell-index offset of the neighbour it leads to.
+_EAST, _WEST, _SOUTH, _NORTH = 1, 2, 4, 8
+_OPEN = {bit: bytes.maketrans(b'\x00\x01', bytes((bit, 0))) for bit in (_EAST, _WEST, _SOUTH, _NORTH)}
+
+def open_masks(grid, S):
+    # One byte per cell, indexed like the distance tables, with _EAST/_WEST/_SOUTH/_NORTH set for
+    # each open side. Built in a few whole-map passes, so the searches test one byte per cell
+    # instead of four map reads and a divmod.
+    grid = _cells(grid)
+    N = S // 2
+    if np is not None:
+        a = np.frombuffer(grid, dtype=np.uint8).reshape(S, S)
+        mask = (a[1::2, 2::2] == 0) * np.uint8(_EAST)
+        mask |= (a[1::2, 0:S - 1:2] == 0) * np.uint8(_WEST)
+        mask |= (a[2::2, 1::2] == 0) * np.uint8(_SOUTH)
+        mask |= (a[0:S - 1:2, 1::2] == 0) * np.uint8(_NORTH)
+        return mask.tobytes()
+    # Without NumPy each side becomes one big integer with that side's bit per byte; the sides
+    # never share a bit, so OR-ing the integers combines them without carries.
+    sides = ((_EAST, 1, 2), (_WEST, 1, 0), (_SOUTH, 2, 1), (_NORTH, 0, 1))
+    value = 0
+    for bit, dz, x0 in sides:
+        side = b''.join(grid[(z + dz) * S + x0:(z + dz) * S + x0 + 2 * N:2] for z in range(0, S - 1, 2))
+        value |= int.from_bytes(bytes(side).translate(_OPEN[bit]), 'little')
+    return value.to_bytes(N * N, 'little')
+
+# Frontiers at least this wide are expanded with NumPy index arithmetic; narrower ones (long
+# corridors) are cheaper as a plain loop, so one BFS pass switches between the two per level.
+VECTOR_FRONTIER_MIN = 64
+
+def _vector_level(front, mask_np, table, value, N):
+    # One BFS level over a wide frontier: marks every unvisited neighbour in table with value
+    # (a level number, or None to store the cell it was reached from) and returns them.
+    front = np.asarray(front, dtype=np.int64)
+    sides = mask_np[front]
+    parts = []
+    for bit, off in ((_EAST, 1), (_WEST, -1), (_SOUTH, N), (_NORTH, -N)):
+        reached = (sides & bit) != 0
+        n = front[reached] + off
+        fresh = table[n] < 0
+        table[n[fresh]] = front[reached][fresh] if value is None else value
+        parts.append(n[fresh])
+    return np.concatenate(parts)
+
+def distance_field(grid, S, source):
+    # Level-synchronous BFS from source; returns steps per cell, -1 where unreachable.
+    N = S // 2
+    mask = open_masks(grid, S)
+    dist = array('i', [-1]) * (N * N)
+    dist[_cell(source, N)] = 0
+    if np is not None:
+        dist_np = np.frombuffer(dist, dtype=np.int32)
+        mask_np = np.frombuffer(mask, dtype=np.uint8)
+    frontier = [_cell(source, N)]
+    d = 0
+    while len(frontier):
+        d += 1
+        if np is not None and len(frontier) >= VECTOR_FRONTIER_MIN:
+            frontier = _vector_level(frontier, mask_np, dist_np, d, N)
+            if len(frontier) < VECTOR_FRONTIER_MIN: frontier = frontier.tolist()
+            continue
+
+        nxt = []
+        for c in frontier:
+            m = mask[c]
+            if m & _EAST and dist[c + 1] < 0:
+                dist[c + 1] = d; nxt.append(c + 1)
+            if m & _WEST and dist[c - 1] < 0:
+                dist[c - 1] = d; nxt.append(c - 1)
+            if m & _SOUTH and dist[c + N] < 0:
+                dist[c + N] = d; nxt.append(c + N)
+            if m & _NORTH and dist[c - N] < 0:
+                dist[c - N] = d; nxt.append(c - N)
+        frontier = nxt
+    return dist
+
+def pick_finish(dist, N, difficulty=1.0, seed=None):
+    # Chooses a cell at the given percentile of path distance from the field's source:
+    # 1.0 is a farthest cell, 0.5 a median one. Ties are broken with a seeded RNG.
+    # Returns cell coordinates (x, z) in 0..N-1, or None when nothing else is reachable.
+    rng = random.Random(seed)
+    if np is not None:
+        d = np.frombuffer(dist, dtype=np.int32)
+        reachable = d[d > 0]
+        if not len(reachable): return None
+        k = int(round(min(max(difficulty, 0.0), 1.0) * (len(reachable) - 1)))
+        candidates = np.flatnonzero(d == np.partition(reachable, k)[k])
+        c = int(candidates[rng.randrange(len(candidates))])
+    else:
+        reachable = sorted(v for v in dist if v > 0)
+        if not reachable: return None
+        k = int(round(min(max(difficulty, 0.0), 1.0) * (len(reachable) - 1)))
+        target = reachable[k]
+        candidates = [i for i, v in enumerate(dist) if v == target]
+        c = candidates[rng.randrange(len(candidates))]
+    return c % N, c // N
+
+def bfs_path(grid, S, start, goal):
+    N = S // 2
+    mask = open_masks(grid, S)
+    src, dst = _cell(start, N), _cell(goal, N)
+    parent = array('i', [-1]) * (N * N)
+    parent[src] = src
+    if np is not None:
+        parent_np = np.frombuffer(parent, dtype=np.int32)
+        mask_np = np.frombuffer(mask, dtype=np.uint8)
+    frontier = [src]
+    while len(frontier) and parent[dst] < 0:
+        if np is not None and len(frontier) >= VECTOR_FRONTIER_MIN:
+            frontier = _vector_level(frontier, mask_np, parent_np, None, N)
+            if len(frontier) < VECTOR_FRONTIER_MIN: frontier = frontier.tolist()
+            continue
+
+        nxt = []
+        for c in frontier:
+            m = mask[c]
+            if m & _EAST and parent[c + 1] < 0:
+                parent[c + 1] = c; nxt.append(c + 1)
+            if m & _WEST and parent[c - 1] < 0:
+                parent[c - 1] = c; nxt.append(c - 1)
+            if m & _SOUTH and parent[c + N] < 0:
+                parent[c + N] = c; nxt.append(c + N)
+            if m & _NORTH and parent[c - N] < 0:
+                parent[c - N] = c; nxt.append(c - N)
+        frontier = nxt
+    if parent[dst] < 0: return None
+    return _cell_coords(_trace(parent, dst, src), N)
+
+def _open_neighbors(mask, c, N):
+    m = mask[c]
+    if m & _EAST: yield c + 1
+    if m & _WEST: yield c - 1
+    if m & _SOUTH: yield c + N
+    if m & _NORTH: yield c - N
+
+def astar_path(grid, S, start, goal):
+    # Manhattan distance in cells is admissible on the 4-connected cell grid. In a perfect maze it
+    # prunes little, since the route to the goal usually leads away from it first, so the heap
+    # makes this slower than bfs_path there; it pays off on open, loop-rich maps.
+    N = S // 2
+    mask = open_masks(grid, S)
+    gx, gz = goal[0] >> 1, goal[1] >> 1
+    src, dst = _cell(start, N), gz * N + gx
+    parent = array('i', [-1]) * (N * N)
+    cost = array('i', [-1]) * (N * N)
+    parent[src] = src; cost[src] = 0
+    heap = [(0, 0, src)]
+    push, pop = heapq.heappush, heapq.heappop
+    while heap:
+        _, d, c = pop(heap)
+        if c == dst:
+            return _cell_coords(_trace(parent, dst, src), N)
+        if d > cost[c]: continue
+        d += 1
+        for n in _open_neighbors(mask, c, N):
+            if cost[n] < 0 or d < cost[n]:
+                cost[n] = d; parent[n] = c
+                z, x = divmod(n, N)
+                push(heap, (d + abs(x - gx) + abs(z - gz), d, n))
+    return None
+
+def bidirectional_path(grid, S, start, goal):
+    # Alternates BFS levels from both ends, always growing the smaller frontier.
+    N = S // 2
+    mask = open_masks(grid, S)
+    src, dst = _cell(start, N), _cell(goal, N)
+    if src == dst:
+        return [start]
+    parents = (array('i', [-1]) * (N * N), array('i', [-1]) * (N * N))
+    parents[0][src] = src
+    parents[1][dst] = dst
+    frontiers = ([src], [dst])
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = parents[side], parents[1 - side]
+        nxt = []
+        for c in frontiers[side]:
+            for n in _open_neighbors(mask, c, N):
+                if mine[n] >= 0: continue
+                mine[n] = c
+                if other[n] >= 0:
+                    head = _trace(parents[0], n, src)
+                    tail = _trace(parents[1], n, dst)
+                    tail.reverse()
+                    return _cell_coords(head + tail[1:], N)
+                nxt.append(n)
+        frontiers = (nxt, frontiers[1]) if side == 0 else (frontiers[0], nxt)
+    return None
+
+SOLVERS = {
+    'bfs': bfs_path,
+    'astar': astar_path,
+    'bidirectional': bidirectional_path,
+}
+
+def solve(grid, S, start, goal, method='bfs'):
+    try:
+        fn = SOLVERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown solver: {method}") from None
+    return fn(grid, S, start, goal)
+
+
+_DIRECTION_NAMES = {(1, 0): 'right', (-1, 0): 'left', (0, 1): 'down', (0, -1): 'up'}
+
+class DistanceField:
+    # Cached BFS distances to one target cell: steps remaining from any cell is a single array read.
+    __slots__ = ('grid', 'S', 'N', 'target', 'dist')
+
+    def __init__(self, grid, S, target, dist=None):
+        # dist takes a table already computed for this grid and target, e.g. from a cache.
+        self.grid = grid
+        self.S = S
+        self.N = S // 2
+        self.target = target
+        self.dist = distance_field(grid, S, target) if dist is None else dist
+
+    def steps_from(self, x, z):
+        return self.dist[(z >> 1) * self.N + (x >> 1)]
+
+    def path_from(self, x, z):
+        # Walks downhill on the field; every step lowers the distance by exactly one.
+        d = self.steps_from(x, z)
+        if d < 0:
+            return None
+        grid, S = self.grid, self.S
+        is_wall = getattr(grid, 'is_wall', None) or (lambda wx, wz: grid[wz * S + wx])
+        path = [(x, z)]
+        while d > 0:
+            for dx, dz in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if is_wall(x + dx, z + dz): continue
+                nx, nz = x + 2 * dx, z + 2 * dz
+                if self.steps_from(nx, nz) == d - 1:
+                    break
+            x, z, d = nx, nz, d - 1
+            path.append((x, z))
+        return path
+
+    def next_step(self, x, z):
+        # Direction name of the first move toward the target, or None when there or unreachable.
+        d = self.steps_from(x, z)
+        if d <= 0:
+            return None
+        grid, S = self.grid, self.S
+        is_wall = getattr(grid, 'is_wall', None) or (lambda wx, wz: grid[wz * S + wx])
+        for dx, dz in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if is_wall(x + dx, z + dz): continue
+            if self.steps_from(x + 2 * dx, z + 2 * dz) == d - 1:
+                return _DIRECTION_NAMES[(dx, dz)]
+
+
+class JunctionGraph:
+    # Corridor-compressed maze: every cell whose degree is not 2 becomes a node, and every corridor
+    # of degree-2 cells between two nodes becomes one weighted edge. Adjacency is CSR
+    # (offsets/targets/weights/edges); corridor interiors are stored per edge in edge_cells so a
+    # cell anywhere in the maze maps to (edge, position) in O(1). Queries run Dijkstra over nodes
+    # only, so their cost follows the junction count rather than the maze area.
+    # For many queries to one fixed target, e.g. hints toward the finish, a DistanceField is faster.
+    __slots__ = ('grid', 'S', 'N', 'node_cells', 'cell_node', 'cell_edge', 'cell_pos',
+                 'edge_u', 'edge_v', 'edge_w', 'edge_start', 'edge_cells',
+                 'offsets', 'targets', 'weights', 'edges')
+
+    def __init__(self, grid, S):
+        self.grid, self.S = _cells(grid), S
+        grid = self.grid
+        N = self.N = S // 2
+        self.node_cells = array('i')
+        self.cell_node = array('i', [-1]) * (N * N)
+        self.cell_edge = array('i', [-1]) * (N * N)
+        self.cell_pos = array('i', [0]) * (N * N)
+        self.edge_u, self.edge_v, self.edge_w = array('i'), array('i'), array('i')
+        self.edge_start, self.edge_cells = array('i', [0]), array('i')
+
+        for z in range(1, S, 2):
+            for x in range(z * S + 1, z * S + S - 1, 2):
+                if sum(1 for _ in _neighbors(grid, x, S)) != 2:
+                    self._add_node(x)
+        for u in range(len(self.node_cells)):
+            self._walk_from(u)
+        # Closed loops of degree-2 cells have no junction; promote one cell per loop to a node.
+        for z in range(1, S, 2):
+            for x in range(z * S + 1, z * S + S - 1, 2):
+                c = _cell_index(x, S, N)
+                if self.cell_node[c] < 0 and self.cell_edge[c] < 0:
+                    self._walk_from(self._add_node(x))
+        self._build_csr()
+        self.grid = None
+
+    def _add_node(self, g):
+        self.cell_node[_cell_index(g, self.S, self.N)] = len(self.node_cells)
+        self.node_cells.append(g)
+        return len(self.node_cells) - 1
+
+    def _walk_from(self, u):
+        grid, S, N = self.grid, self.S, self.N
+        start = self.node_cells[u]
+        for first in _neighbors(grid, start, S):
+            c = _cell_index(first, S, N)
+            v = self.cell_node[c]
+            if v >= 0:
+                if u < v: self._add_edge(u, v, [])
+                continue
+            if self.cell_edge[c] >= 0:
+                continue
+            prev, cur, interior = start, first, []
+            while self.cell_node[_cell_index(cur, S, N)] < 0:
+                interior.append(cur)
+                prev, cur = cur, next(n for n in _neighbors(grid, cur, S) if n != prev)
+            self._add_edge(u, self.cell_node[_cell_index(cur, S, N)], interior)
+
+    def _add_edge(self, u, v, interior):
+        e = len(self.edge_u)
+        self.edge_u.append(u); self.edge_v.append(v); self.edge_w.append(len(interior) + 1)
+        for p, g in enumerate(interior, 1):
+            c = _cell_index(g, self.S, self.N)
+            self.cell_edge[c] = e; self.cell_pos[c] = p
+        self.edge_cells.extend(interior)
+        self.edge_start.append(len(self.edge_cells))
+
+    def _build_csr(self):
+        count = len(self.node_cells)
+        degree = [0] * (count + 1)
+        for u, v in zip(self.edge_u, self.edge_v):
+            degree[u + 1] += 1; degree[v + 1] += 1
+        for i in range(count):
+            degree[i + 1] += degree[i]
+        self.offsets = array('i', degree)
+        fill = list(degree[:count])
+        size = degree[count]
+        self.targets, self.weights, self.edges = (array('i', [0]) * size for _ in range(3))
+        for e, (u, v, w) in enumerate(zip(self.edge_u, self.edge_v, self.edge_w)):
+            for a, b in ((u, v), (v, u)):
+                i = fill[a]; fill[a] += 1
+                self.targets[i] = b; self.weights[i] = w; self.edges[i] = e
+
+    @property
+    def node_count(self):
+        return len(self.node_cells)
+
+    def _anchors(self, g):
+        # Graph nodes a cell can reach directly, with the steps to each.
+        c = _cell_index(g, self.S, self.N)
+        node = self.cell_node[c]
+        if node >= 0:
+            return {node: 0}
+        e, p = self.cell_edge[c], self.cell_pos[c]
+        u, v, w = self.edge_u[e], self.edge_v[e], self.edge_w[e]
+        if u == v:
+            return {u: min(p, w - p)}
+        return {u: p, v: w - p}
+
+    def _search(self, src, dst):
+        # Dijkstra over nodes; returns (distance or -1, parent links, node where the route reaches goal).
+        sources, goals = self._anchors(src), self._anchors(dst)
+        best, meet = -1, None
+        e_src = self.cell_edge[_cell_index(src, self.S, self.N)]
+        if e_src >= 0 and e_src == self.cell_edge[_cell_index(dst, self.S, self.N)]:
+            best = abs(self.cell_pos[_cell_index(src, self.S, self.N)] - self.cell_pos[_cell_index(dst, self.S, self.N)])
+        dist = array('i', [-1]) * len(self.node_cells)
+        parent = {}
+        for n, d in sources.items(): dist[n] = d
+        heap = [(d, n) for n, d in sources.items()]
+        heapq.heapify(heap)
+        offsets, targets, weights, edges = self.offsets, self.targets, self.weights, self.edges
+        push, pop = heapq.heappush, heapq.heappop
+        while heap:
+            d, n = pop(heap)
+            if best >= 0 and d >= best: break
+            if d > dist[n]: continue
+            if n in goals and (best < 0 or d + goals[n] < best):
+                best, meet = d + goals[n], n
+            for i in range(offsets[n], offsets[n + 1]):
+                t, nd = targets[i], d + weights[i]
+                # A dead end that is not a goal anchor can never lie on a route; skip it.
+                if offsets[t + 1] - offsets[t] == 1 and t not in goals: continue
+                if dist[t] < 0 or nd < dist[t]:
+                    dist[t] = nd; parent[t] = (n, edges[i])
+                    push(heap, (nd, t))
+        return best, parent, meet
+
+    def distance(self, start, goal):
+        d, _, _ = self._search(start[1] * self.S + start[0], goal[1] * self.S + goal[0])
+        return d if d >= 0 else None
+
+    def _corridor(self, e, frm):
+        # Interior cells of edge e, ordered walking away from node frm.
+        cells = list(self.edge_cells[self.edge_start[e]:self.edge_start[e + 1]])
+        return cells if self.edge_u[e] == frm else cells[::-1]
+
+    def _walk_edge(self, g, toward):
+        # Cells from g (exclusive) to node `toward` along g's own corridor.
+        c = _cell_index(g, self.S, self.N)
+        e, p = self.cell_edge[c], self.cell_pos[c]
+        cells = list(self.edge_cells[self.edge_start[e]:self.edge_start[e + 1]])
+        if toward == self.edge_u[e] and (self.edge_v[e] != toward or p <= self.edge_w[e] - p):
+            return cells[:p - 1][::-1] + [self.node_cells[toward]]
+        return cells[p:] + [self.node_cells[toward]]
+
+    def path(self, start, goal):
+        S = self.S
+        src, dst = start[1] * S + start[0], goal[1] * S + goal[0]
+        best, parent, meet = self._search(src, dst)
+        if best < 0:
+            return None
+        if meet is None:
+            c = _cell_index(src, S, self.N)
+            e, ps, pd = self.cell_edge[c], self.cell_pos[c], self.cell_pos[_cell_index(dst, S, self.N)]
+            cells = self.edge_cells[self.edge_start[e]:self.edge_start[e + 1]]
+            seg = cells[ps - 1:pd] if ps <= pd else cells[pd - 1:ps][::-1]
+            return _to_coords(list(seg), S)
+
+        nodes, edges = [meet], []
+        while nodes[-1] in parent:
+            n, e = parent[nodes[-1]]
+            nodes.append(n); edges.append(e)
+        nodes.reverse(); edges.reverse()
+
+        path = [src]
+        if self.cell_node[_cell_index(src, S, self.N)] < 0:
+            path += self._walk_edge(src, nodes[0])
+        for (a, e), b in zip(zip(nodes, edges), nodes[1:]):
+            path += self._corridor(e, a) + [self.node_cells[b]]
+        if dst != path[-1]:
+            path += self._walk_edge(dst, meet)[::-1][1:] + [dst]
+        return _to_coords(path, S)
+
+    def next_step(self, start, goal):
+        # Direction name of the first move on a shortest route, or None when already there.
+        path = self.path(start, goal)
+        if not path or len(path) < 2:
+            return None
+        (x0, z0), (x1, z1) = path[0], path[1]
+        if x1 != x0: return 'right' if x1 > x0 else 'left'
+        return 'down' if z1 > z0 else 'up'
@@ -0,0 +1,128 @@
+import cProfile
+import collections
+import functools
+import io
+import pstats
+import time
+
+# Hot-path timers and counters. Everything is off by default; a disabled timer costs one attribute
+# check per call, so the decorators can stay on the game loop permanently. Timers keep
+# [count, total, last, max] in seconds; "last" is what the stats panel shows as the per-frame time.
+
+DCC_PREFIX = 'cmds.'
+
+
+class Stats:
+    __slots__ = ('enabled', 'timers', 'counters', 'profiler')
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = collections.Counter()
+        self.profiler = None
+
+    def reset(self):
+        self.timers.clear()
+        self.counters.clear()
+
+    def add(self, name, seconds):
+        t = self.timers.get(name)
+        if t is None: t = self.timers[name] = [0, 0.0, 0.0, 0.0]
+        t[0] += 1; t[1] += seconds; t[2] = seconds
+        if seconds > t[3]: t[3] = seconds
+
+    def count(self, name, n=1):
+        if self.enabled: self.counters[name] += n
+
+    def snapshot(self):
+        timers = {name: {'count': c, 'total_ms': total * 1000, 'last_ms': last * 1000,
+                         'mean_ms': total / c * 1000, 'max_ms': peak * 1000}
+                  for name, (c, total, last, peak) in self.timers.items()}
+        return {'timers': timers, 'counters': dict(self.counters)}
+
+    def dcc_calls(self):
+        return {name[len(DCC_PREFIX):]: n for name, n in self.counters.items() if name.startswith(DCC_PREFIX)}
+
+    def report(self):
+        lines = []
+        for name, (c, total, last, peak) in sorted(self.timers.items()):
+            lines.append(f"{name:<16} n={c:<6} last {last * 1000:8.2f} ms  mean {total / c * 1000:8.2f} ms  max {peak * 1000:8.2f} ms")
+        for name, n in sorted(self.counters.items()):
+            if not name.startswith(DCC_PREFIX): lines.append(f"{name:<16} {n}")
+        calls = self.dcc_calls()
+        if calls:
+            top = ', '.join(f'{name} {n}' for name, n in sorted(calls.items(), key=lambda kv: -kv[1])[:5])
+            lines.append(f"DCC calls: {sum(calls.values())} ({top})")
+        return '\n'.join(lines)
+
+STATS = Stats()
+
+
+def timed(name):
+    # Decorator: adds the call's wall time to timer `name` while STATS is enabled.
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not STATS.enabled: return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STATS.add(name, time.perf_counter() - t0)
+        return wrapper
+    return decorate
+
+
+class section:
+    # Context-manager form of timed() for phases inside a function.
+    __slots__ = ('name', 't0')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter() if STATS.enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.t0 is not None: STATS.add(self.name, time.perf_counter() - self.t0)
+
+
+class CallCounter:
+    # Stands in for a command module (maya.cmds or CmdsStub) and counts calls per command, either
+    # in its own Counter or in a shared one under a prefix. Wrappers are cached on first use.
+    def __init__(self, target, calls=None, prefix=''):
+        self.target = target
+        self.calls = collections.Counter() if calls is None else calls
+        self.prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if not callable(attr): return attr
+        calls, key = self.calls, self.prefix + name
+
+        def counted(*args, **kwargs):
+            calls[key] += 1
+            return attr(*args, **kwargs)
+        setattr(self, name, counted)
+        return counted
+
+    @property
+    def total(self):
+        return sum(n for name, n in self.calls.items() if name.startswith(self.prefix))
+
+
+def start_profile():
+    if STATS.profiler is None:
+        STATS.profiler = cProfile.Profile()
+        STATS.profiler.enable()
+
+def stop_profile(path=None, limit=25):
+    # Stops a capture; dumps raw pstats data to path if given and returns the top entries as text.
+    profiler, STATS.profiler = STATS.profiler, None
+    if profiler is None: return ''
+    profiler.disable()
+    if path: profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
@@ -1,21 +1,32 @@
 import random
 import sys
 import os
+import time
+import hashlib
+import concurrent.futures
 
-try:
-    from PySide6 import QtCore, QtGui, QtWidgets
-    from shiboken6 import wrapInstance, isValid
-    from PySide6.QtGui import QIntValidator, QDoubleValidator
-    from PySide6.QtCore import Qt, QTimer
-except ImportError:
+# Qt is imported by load_qt() when the dialog is first created, so the scene and game code here
+# loads without it for headless runs, batch jobs and benchmarks.
+QtCore = QtGui = QtWidgets = Qt = QIntValidator = QDoubleValidator = wrapInstance = None
+
+def isValid(obj):
+    # Replaced by shiboken's isValid in load_qt(); before that no Qt object can exist.
+    return False
+
+def load_qt():
+    global QtCore, QtGui, QtWidgets, Qt, QIntValidator, QDoubleValidator, wrapInstance, isValid
+    if QtWidgets is not None: return
     try:
-        from PySide2 import QtCore, QtGui, QtWidgets
-        from shiboken2 import wrapInstance, isValid
-        from PySide2.QtGui import QIntValidator, QDoubleValidator
-        from PySide2.QtCore import Qt, QTimer
+        from PySide6 import QtCore, QtGui, QtWidgets
+        from shiboken6 import wrapInstance, isValid
     except ImportError:
-        print("Error: PySide6 or PySide2 not found.")
-        sys.exit()
+        try:
+            from PySide2 import QtCore, QtGui, QtWidgets
+            from shiboken2 import wrapInstance, isValid
+        except ImportError:
+            raise ImportError("PySide6 or PySide2 not found.") from None
+    Qt = QtCore.Qt
+    QIntValidator, QDoubleValidator = QtGui.QIntValidator, QtGui.QDoubleValidator
 
 ROOT_RESOURCE_DIR = 'C:/Users/User/Documents/maya/2025/scripts/MazeProject/images'
 IMAGE_PATH = os.path.join(ROOT_RESOURCE_DIR, 'Illustration.jpg').replace('\\', '/')
@@ -25,33 +36,72 @@ try:
     import maya.OpenMayaUI as omui
 except ImportError:
     class CmdsStub:
-        def objExists(self, *args): return False
-        def evalDeferred(self, *args): pass
-        def delete(self, *args): pass
+        # Remembers the names of the nodes it "creates" so objExists answers like a scene would.
+        def __init__(self): self.nodes = set()
+        def _create(self, kwargs, default):
+            name = kwargs.get('n') or kwargs.get('name') or default
+            self.nodes.add(name)
+            return name
+        def objExists(self, name): return name in self.nodes
+        def evalDeferred(self, fn, *args):
+            if callable(fn): fn()
+        def delete(self, *args):
+            for arg in args: self.nodes.difference_update([arg] if isinstance(arg, str) else arg)
         def warning(self, *args): print("Warning:", *args)
         def xform(self, *args, **kwargs): return [0, 0, 0]
         def move(self, *args): pass
-        def polyCube(self, *args, **kwargs): return ['dummy']
-        def polySphere(self, *args, **kwargs): return ['dummy']
+        def polyCube(self, *args, **kwargs): return [self._create(kwargs, 'pCube')]
+        def polySphere(self, *args, **kwargs): return [self._create(kwargs, 'pSphere')]
         def setAttr(self, *args, **kwargs): pass
         def confirmDialog(self, *args, **kwargs): return 'OK'
         def promptDialog(self, *args, **kwargs): return 'OK'
-        def group(self, *args, **kwargs): return 'dummy_group'
-        def select(self, *args): pass
+        def group(self, *args, **kwargs): return self._create(kwargs, 'group')
+        def select(self, *args, **kwargs): pass
         def hyperShade(self, *args, **kwargs): pass
-        def shadingNode(self, *args, **kwargs): return 'lambertDummy'
+        def sets(self, *args, **kwargs): return None if kwargs.get('edit') else self._create(kwargs, 'set')
+        def connectAttr(self, *args, **kwargs): pass
+        def shadingNode(self, *args, **kwargs): return self._create(kwargs, 'lambert')
+        def parent(self, *args, **kwargs): pass
+        def polyUnite(self, *args, **kwargs): return [self._create(kwargs, 'polySurface')]
+        def instance(self, *args, **kwargs): return [self._create(kwargs, 'instance')]
+        def particle(self, *args, **kwargs): return [self._create(kwargs, 'particle'), 'particleShape']
     cmds = CmdsStub()
     omui = None
+_build_executor = None
+
+try:
+    from . import projectUtil, projectSolver, projectIO, projectStats, projectCache
+except ImportError:
+    import projectUtil
+    import projectSolver
+    import projectIO
+    import projectStats
+    import projectCache
 
 M = {
-    'mode': 'Normal', 'size': 7, 'wall_height': 1.0, 'player_color': 6,
-    'start': (0, 0), 'finish': None, 'walls': [], 'map': [], 
-    'player': None, 'steps': 0, 'time_limit': 0, 'time_left': 0,
-    'timer': None, 'running': False 
+    'mode': 'Normal', 'size': 7, 'wall_height': 1.0, 'player_color': 6, 'algorithm': 'backtracker',
+    'start': (0, 0), 'finish': None, 'walls': {}, 'map': [], 'seed': None,
+    'player': None, 'time_limit': 0, 'game': None, 'distances': None, 'difficulty': 0.75,
+    'timer': None, 'wall_mode': 'rectangles', 'wall_source': None, 'build_stats': None,
+    'walls_group': None, 'built_wall_mode': None, 'finish_node': None, 'scene_group': None, 'build': None,
+    'lod': 'hide', 'chunks': {}, 'chunk_proxies': {}, 'chunk_state': {}, 'lod_center': None,
+    'materials': {}, 'colors': {}, 'crowd': None, 'crowd_node': None, 'crowd_shown': 0.0,
+    'maze_algorithm': None, 'last_replay': None
 }
 
 ui = None
-TIME_PENALTY_PER_STEP = 2 
+TIME_PENALTY_PER_STEP = 2 # seconds off the clock per step in Timed mode
+CLOCK_REFRESH_MS = 50 # time display refresh; the clock itself runs on perf_counter deadlines
+WALL_COLOR = 4 # Grey
+FINISH_COLOR = 13 # Red
+CHUNK_SIZE = 32 # map units, 16 x 16 cells
+CHUNK_VIEW_RADIUS = 2 # chunks around the player's kept at full detail
+MAX_MAZE_SIZE = projectSolver.MAX_SOLVE_SIZE # cells per side offered by the dialog, the solvers' limit; big enough for chunk LOD and sliced builds to matter
+BUILD_SLICE_SECONDS = 0.02
+CROWD_TICK_MS = 16 # crowd simulation step interval
+CROWD_SCENE_SECONDS = 0.25 # the crowd's particle cloud is rebuilt at most this often
+MAZE_FILE_FILTER = "Maze Files (*.maze);;All Files (*)"
+REPLAY_FILE_FILTER = "Maze Replays (*.mzr);;All Files (*)"
 
 
 def get_rgb_from_color_index(index):
@@ -62,47 +112,308 @@ def get_rgb_from_color_index(index):
     }
     return colors.get(index, (1.0, 0.5, 0.0))
 
-def create_and_assign_color_material(obj_name, color_index, material_name):
-    try:
-        if not cmds.objExists(material_name):
-            material = cmds.shadingNode('lambert', asShader=True, n=material_name)
-            cmds.setAttr(f'{material}.ambientColor', 0.1, 0.1, 0.1)
-            cmds.setAttr(f'{material}.diffuse', 0.8)
-        else:
-            material = material_name
-
+def shading_group(color_index):
+    # Lambert + shading group for a palette color, created once and cached in M['materials'];
+    # a shader left in the scene by an earlier session is picked up instead of duplicated.
+    cached = M['materials'].get(color_index)
+    if cached: return cached[1]
+    name = f'maze_color_{color_index}'
+    if cmds.objExists(f'{name}_SG') and cmds.objExists(f'{name}_mat'):
+        material, sg = f'{name}_mat', f'{name}_SG'
+    else:
+        material = cmds.shadingNode('lambert', asShader=True, n=f'{name}_mat')
+        cmds.setAttr(f'{material}.ambientColor', 0.1, 0.1, 0.1)
+        cmds.setAttr(f'{material}.diffuse', 0.8)
         r, g, b = get_rgb_from_color_index(color_index)
         cmds.setAttr(f'{material}.color', r, g, b, type='double3')
-
-        cmds.select(obj_name, replace=True)
-        cmds.hyperShade(assign=material)
-        cmds.select(clear=True) 
-
-        cmds.setAttr(f'{obj_name}.overrideEnabled', 0) 
-        return material
+        sg = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=f'{name}_SG')
+        cmds.connectAttr(f'{material}.outColor', f'{sg}.surfaceShader', force=True)
+    M['materials'][color_index] = (material, sg)
+    return sg
+
+@projectStats.timed('material')
+def assign_color(objects, color_index, track=True):
+    # Bulk assignment through shading-group membership: one sets() call for the whole batch and
+    # none for tracked objects (player, finish) that already wear this color. Walls are assigned
+    # once when created, so they are not tracked.
+    pending = [obj for obj in objects if M['colors'].get(obj) != color_index] if track else list(objects)
+    if not pending: return
+    try:
+        try:
+            cmds.sets(*pending, edit=True, forceElement=shading_group(color_index))
+        except RuntimeError:
+            # The cached shader was deleted behind our back; build it again once.
+            M['materials'].pop(color_index, None)
+            cmds.sets(*pending, edit=True, forceElement=shading_group(color_index))
     except Exception as e:
-        cmds.warning(f"Error assigning material to {obj_name}: {e}")
-        return None
-
-def generateMaze(N):
-    S = 2 * N + 1
-    maze = [[1] * S for _ in range(S)]
-    def carve(x, y):
-        directions = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-        random.shuffle(directions)
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < S and 0 <= ny < S and maze[ny][nx] == 1:
-                maze[y + dy // 2][x + dx // 2] = 0
-                maze[ny][nx] = 0
-                carve(nx, ny)
-    maze[1][1] = 0 
-    carve(1, 1)
-    return maze
+        cmds.warning(f"Error assigning material to {pending[0]}: {e}")
+        return
+    if track:
+        for obj in pending: M['colors'][obj] = color_index
+
+def clear_materials():
+    nodes = [node for pair in M['materials'].values() for node in pair if cmds.objExists(node)]
+    if nodes: cmds.delete(*nodes)
+    M['materials'] = {}; M['colors'] = {}
+
+@projectStats.timed('generate')
+def generateMaze(N, seed=None, algorithm='backtracker'):
+    # Seeded mazes come from (and go into) the shared cache; unseeded ones are never repeated.
+    if seed is not None: return projectCache.MAZES.grid(N, seed, algorithm)
+    return projectUtil.MazeGrid.from_cells(projectUtil.generate(N, algorithm, seed), 2 * N + 1)
+
+def _wall_source():
+    if not M['wall_source']:
+        M['wall_source'] = cmds.polyCube(w=1, h=1, d=1, n='wall_src')[0]
+        cmds.setAttr(f"{M['wall_source']}.visibility", 0)
+        assign_color([M['wall_source']], WALL_COLOR, track=False)
+        if M['walls_group']: cmds.parent(M['wall_source'], M['walls_group'], relative=True)
+    return M['wall_source']
+
+def wall_boxes(rows, z0=0, mode='cubes'):
+    # (x, z, width, depth) boxes in map units for rows starting at z0: one per wall cell for
+    # 'cubes' and 'instanced', one per horizontal run for 'strips' and 'combined', one per greedily
+    # merged rectangle for 'rectangles'.
+    if mode == 'rectangles':
+        yield from projectUtil.mesh_rectangles(rows, z0)
+        return
+    per_cell = mode in ('cubes', 'instanced')
+    for z, row in enumerate(rows, z0):
+        for x0, length in projectUtil.row_runs(row):
+            if per_cell:
+                for x in range(x0, x0 + length): yield x, z, 1, 1
+            else:
+                yield x0, z, length, 1
+
+def _create_wall(box, source=None):
+    # Walls are unit height; the height itself is the Y scale of the walls group. Names follow the
+    # box, so a new wall never collides with a stale one that is about to be deleted.
+    x, z, width, depth = box
+    name = f'wall_{x}_{z}' if width == depth == 1 else f'wall_{x}_{z}_{width}x{depth}'
+    if source: w = cmds.instance(source, n=name)[0]
+    else: w = cmds.polyCube(w=width, h=1, d=depth, n=name)[0]
+    cmds.move(x + (width - 1) / 2.0, 0.5, z + (depth - 1) / 2.0, w)
+    return w
+
+def _split_at_chunks(box):
+    # Bands are already CHUNK_SIZE rows deep, so boxes only need cutting along x.
+    x, z, width, depth = box
+    end = x + width
+    while x < end:
+        cut = min(end, (x // CHUNK_SIZE + 1) * CHUNK_SIZE)
+        yield x, z, cut - x, depth
+        x = cut
+
+def wall_chunk(key):
+    # Spatial chunk (cx, cz) a wall key belongs to.
+    if key[0] == 'combined': return key[1], key[2]
+    return key[0] // CHUNK_SIZE, key[1] // CHUNK_SIZE
+
+def mesh_walls(grid, mode):
+    # Wall meshing for a build, safe to run off the main thread: a list of (key, strips) items, one
+    # per node. The maze is meshed in spatial chunks of CHUNK_SIZE x CHUNK_SIZE map units and boxes
+    # are cut at chunk borders, so every node belongs to exactly one chunk. key is the box
+    # (x, z, width, depth) and strips is None, except in 'combined' mode where a key stands for a
+    # whole chunk, keyed by a hash of its cells, and strips are the boxes to unite.
+    plan = []
+    for z0, band in projectUtil.chunk_rows(grid, CHUNK_SIZE):
+        pieces = [piece for box in wall_boxes(band, z0, mode) for piece in _split_at_chunks(box)]
+        if mode != 'combined':
+            plan.extend((piece, None) for piece in pieces)
+            continue
+        by_chunk = {}
+        for piece in pieces: by_chunk.setdefault(piece[0] // CHUNK_SIZE, []).append(piece)
+        for cx, strips in by_chunk.items():
+            x0 = cx * CHUNK_SIZE
+            block = b''.join(row[x0:x0 + CHUNK_SIZE] for row in band)
+            plan.append((('combined', cx, z0 // CHUNK_SIZE, hashlib.blake2b(block, digest_size=16).digest()), strips))
+    return plan
+
+def order_walls(plan, near=(1, 1)):
+    # A copy of a mesh_walls plan sorted nearest to `near` (map coordinates) first, so the player's
+    # surroundings go up first.
+    px, pz = near
+
+    def distance(item):
+        key, strips = item
+        if strips is None: x, z, width, depth = key
+        else: x, z, width, depth = key[1] * CHUNK_SIZE, key[2] * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE
+        return max(x - px, px - (x + width - 1), z - pz, pz - (z + depth - 1), 0)
+
+    return sorted(plan, key=distance)
+
+class SceneBuild:
+    # Main-thread half of a wall build. Construction diffs the plan against M['walls'] (key -> node)
+    # and deletes stale nodes in one call; step() then creates the missing walls for about `budget`
+    # seconds, so a QTimer can spread the build over many event-loop turns. M['walls'] always
+    # matches the scene, so a cancelled build is still a valid base for the next diff.
+    @projectStats.timed('build.diff')
+    def __init__(self, plan, mode):
+        self.mode = mode
+        walls = M['walls']
+        needed = {key for key, _ in plan}
+        stale = [walls.pop(key) for key in [key for key in walls if key not in needed]]
+        if stale: cmds.delete(*stale)
+        self.deleted = len(stale)
+        self.todo = [item for item in plan if item[0] not in walls]
+        self.index = 0
+        self.source = _wall_source() if mode == 'instanced' and self.todo else None
+        self.seconds = 0.0
+
+    @property
+    def created(self):
+        return self.index
+
+    @property
+    def done(self):
+        return self.index >= len(self.todo)
+
+    @property
+    def progress(self):
+        return self.index / len(self.todo) if self.todo else 1.0
+
+    @projectStats.timed('build.walls')
+    def step(self, budget=BUILD_SLICE_SECONDS):
+        t0 = time.perf_counter()
+        deadline = t0 + budget
+        walls, todo = M['walls'], self.todo
+        created = {}
+        try:
+            while self.index < len(todo):
+                key, strips = todo[self.index]
+                if strips is None:
+                    node = _create_wall(key, self.source)
+                else:
+                    nodes = [_create_wall(box) for box in strips]
+                    node = nodes[0] if len(nodes) == 1 else cmds.polyUnite(*nodes, ch=False, n=f'walls_{key[1]}_{key[2]}_{key[3][:4].hex()}')[0]
+                walls[key] = node
+                created.setdefault(wall_chunk(key), []).append(node)
+                # Only counted once the node exists, so a failing wall is retried, never skipped.
+                self.index += 1
+                if time.perf_counter() >= deadline: break
+        finally:
+            # Walls created before a failure are still parented and coloured like the rest.
+            for chunk, nodes in created.items(): cmds.parent(*nodes, chunk_group(chunk), relative=True)
+            # Instances share the source's shape and with it the source's material.
+            if created and not self.source: assign_color([node for nodes in created.values() for node in nodes], WALL_COLOR, track=False)
+            self.seconds += time.perf_counter() - t0
+        return self.done
+
+    def run(self):
+        # Synchronous build in a single slice, so the DCC calls it makes do not depend on timing.
+        self.step(float('inf'))
+        return self
+
+
+def build_executor():
+    # A single background thread for generation, solving and meshing; cmds stays on the main thread.
+    global _build_executor
+    if _build_executor is None:
+        _build_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='maze_build')
+    return _build_executor
+
+def prepare_layout(grid, N, start, finish, mode, entry=None):
+    # Worker-thread part of a build for a ready grid; touches neither cmds nor M. With a
+    # projectCache entry for the grid, the distance field and wall meshing come from the cache.
+    if not isinstance(grid, projectUtil.MazeGrid):
+        grid = projectUtil.MazeGrid.from_cells(grid, 2 * N + 1)
+    FX, FZ = finish[0] * 2 + 1, finish[1] * 2 + 1
+    with projectStats.section('build.solve'):
+        if entry is None: distances = projectSolver.DistanceField(grid, 2 * N + 1, (FX, FZ))
+        else: distances = projectCache.MAZES.distances(entry, (FX, FZ))
+    with projectStats.section('build.mesh'):
+        if entry is None: plan = mesh_walls(grid, mode)
+        else: plan = projectCache.MAZES.mesh(entry, (mode, CHUNK_SIZE), lambda grid: mesh_walls(grid, mode))
+        plan = order_walls(plan, (start[0] * 2 + 1, start[1] * 2 + 1))
+    return {'map': grid, 'N': N, 'start': start, 'finish': finish, 'mode': mode, 'distances': distances, 'plan': plan}
+
+def prepare_maze(N, algorithm, seed, start, difficulty, mode, persistent=True):
+    # Generates a maze (or takes it from the cache) and places the finish, then prepares it like a
+    # loaded one. None when the maze is too small for a finish. persistent=False keeps the maze
+    # off the cache's disk tier, for seeds nobody asked for.
+    with projectStats.section('build.generate'):
+        entry = projectCache.MAZES.entry(N, seed, algorithm, persistent)
+    SX, SZ = start
+    with projectStats.section('build.finish'):
+        if difficulty is None:
+            available_cells = [(i, j) for i in range(N) for j in range(N) if (i, j) != (SX, SZ)]
+            finish = random.choice(available_cells) if available_cells else None
+        else:
+            from_start = projectCache.MAZES.distances(entry, (SX * 2 + 1, SZ * 2 + 1)).dist
+            finish = projectSolver.pick_finish(from_start, N, difficulty, seed)
+    if finish is None: return None
+    return prepare_layout(entry.grid, N, start, finish, mode, entry)
+
+def prepare_loaded(grid, N, seed, algorithm, start, finish, mode):
+    # prepare_layout for a maze file. The cache is only used when it holds this seed's maze and
+    # the file's walls match it, since a file may have been edited or written by another generator.
+    entry = projectCache.MAZES.lookup(N, seed, algorithm) if seed is not None else None
+    if entry is not None and entry.grid != grid: entry = None
+    return prepare_layout(grid, N, start, finish, mode, entry)
+
+def chunk_group(chunk):
+    # Group holding one spatial chunk's walls, created on first use and shown or hidden as a whole.
+    group = M['chunks'].get(chunk)
+    if group is None:
+        group = M['chunks'][chunk] = cmds.group(empty=True, name=f'chunk_{chunk[0]}_{chunk[1]}')
+        cmds.parent(group, M['walls_group'], relative=True)
+        _show_chunk(chunk, _chunk_in_view(chunk))
+    return group
+
+def _chunk_in_view(chunk):
+    center = M['lod_center']
+    if M['lod'] is None or center is None: return True
+    return max(abs(chunk[0] - center[0]), abs(chunk[1] - center[1])) <= CHUNK_VIEW_RADIUS
+
+def _chunk_proxy(chunk):
+    # One low-poly box over the chunk's footprint, shown while the chunk itself is hidden.
+    proxy = M['chunk_proxies'].get(chunk)
+    if proxy is None:
+        S = M['map'].S
+        x, z = chunk[0] * CHUNK_SIZE, chunk[1] * CHUNK_SIZE
+        width, depth = min(CHUNK_SIZE, S - x), min(CHUNK_SIZE, S - z)
+        proxy = M['chunk_proxies'][chunk] = cmds.polyCube(w=width, h=1, d=depth, n=f'chunk_{chunk[0]}_{chunk[1]}_proxy')[0]
+        cmds.move(x + (width - 1) / 2.0, 0.5, z + (depth - 1) / 2.0, proxy)
+        cmds.parent(proxy, M['walls_group'], relative=True)
+        assign_color([proxy], WALL_COLOR, track=False)
+    return proxy
+
+def _show_chunk(chunk, visible):
+    # Only touches the scene when the chunk's state (or the LOD setting) actually changes.
+    state = (visible, M['lod'])
+    if M['chunk_state'].get(chunk) == state: return
+    M['chunk_state'][chunk] = state
+    cmds.setAttr(f"{M['chunks'][chunk]}.visibility", visible)
+    use_proxy = M['lod'] == 'proxy' and not visible
+    proxy = _chunk_proxy(chunk) if use_proxy else M['chunk_proxies'].get(chunk)
+    if proxy: cmds.setAttr(f'{proxy}.visibility', use_proxy)
+
+def update_chunk_visibility(x, z, force=False):
+    # Keeps the chunks within CHUNK_VIEW_RADIUS of map position (x, z) at full detail and hides
+    # (or proxies) the rest. Cheap to call every move: nothing happens until the player changes chunk.
+    center = (x // CHUNK_SIZE, z // CHUNK_SIZE)
+    if center == M['lod_center'] and not force: return
+    M['lod_center'] = center
+    for chunk in M['chunks']: _show_chunk(chunk, _chunk_in_view(chunk))
+
+def set_instrumentation(enabled):
+    # Switches the projectStats timers on or off and routes cmds through a call counter meanwhile,
+    # so the stats panel can show how many DCC calls each action makes.
+    global cmds
+    projectStats.STATS.enabled = enabled
+    if enabled and not isinstance(cmds, projectStats.CallCounter):
+        cmds = projectStats.CallCounter(cmds, projectStats.STATS.counters, projectStats.DCC_PREFIX)
+    elif not enabled and isinstance(cmds, projectStats.CallCounter):
+        cmds = cmds.target
+
+def set_wall_height(H):
+    # A single attribute edit: every wall is a unit-height box under the walls group.
+    M['wall_height'] = H
+    group = M['walls_group']
+    if group and cmds.objExists(group): cmds.setAttr(f'{group}.scaleY', H)
 
 def stop_game_timer():
-    global M
-    M['running'] = False
+    if M['game']: M['game'].stop()
     t = M.get('timer')
     dlg = MazeConfigDialog.instance
     
@@ -116,24 +427,72 @@ def stop_game_timer():
         
     M['timer'] = None
 
-def resetMaze(clearOnly=False):
+def show_crowd(crowd):
+    # The whole crowd is one particle object, rebuilt rather than edited: moving particles one by
+    # one would cost a DCC call per agent.
+    if M['crowd_node'] and cmds.objExists(M['crowd_node']): cmds.delete(M['crowd_node'])
+    points = [(x, 0.2, z) for x, z in zip(map(int, crowd.x), map(int, crowd.z))]
+    M['crowd_node'] = cmds.particle(p=points, n='maze_crowd')[0]
+    if M['scene_group'] and cmds.objExists(M['scene_group']): cmds.parent(M['crowd_node'], M['scene_group'])
+    M['crowd_shown'] = time.perf_counter()
+
+def stop_crowd(clear=True):
+    # clear removes the particle cloud too; otherwise it stays where the crowd ended.
+    M['crowd'] = None
+    dlg = MazeConfigDialog.instance
+    if dlg and isValid(dlg):
+        dlg.crowd_timer.stop()
+        if dlg.crowd_button: dlg.crowd_button.setText("Start Crowd")
+    if clear:
+        node, M['crowd_node'] = M['crowd_node'], None
+        if node and cmds.objExists(node): cmds.delete(node)
+
+def stop_build():
+    # Abandons an in-flight build; walls created so far stay in M['walls'] for the next diff.
+    build, M['build'] = M['build'], None
+    if build and build['future']: build['future'].cancel()
+    dlg = MazeConfigDialog.instance
+    if dlg and isValid(dlg):
+        dlg.build_timer.stop()
+        dlg.show_build_progress(False)
+
+def make_replay(game):
+    # None unless the maze can be regenerated: replays store its seed, not its walls.
+    if M['seed'] is None or M['maze_algorithm'] not in projectIO.REPLAY_ALGORITHMS: return None
+    return projectIO.Replay.from_game(game, M['seed'], M['maze_algorithm'], M['start'])
+
+def end_game(game):
+    # Called the moment a game is won or lost, before any dialog: the clock is already frozen by
+    # MazeGame, so the replay records the time actually played.
     stop_game_timer()
+    if game.moves: M['last_replay'] = make_replay(game)
+
+def resetMaze(clearOnly=False, keepScene=False):
+    # keepScene leaves walls, spheres and materials in place for the next build to diff against.
+    stop_build()
+    stop_game_timer()
+    stop_crowd()
+    game = M['game'] # an abandoned run is recorded here; finished ones were by end_game
+    if game is not None and game.moves and game.result is None: M['last_replay'] = make_replay(game)
     
-    to_delete = []
-    if cmds.objExists('playerMat'): to_delete.append('playerMat')
-    if cmds.objExists('finishMat'): to_delete.append('finishMat')
-    if cmds.objExists('wallMat'): to_delete.append('wallMat')
-    if cmds.objExists('Maze_GRP'): to_delete.append('Maze_GRP')
-    
-    if to_delete: cmds.evalDeferred(lambda: cmds.delete(to_delete))
+    if not keepScene:
+        # Shaders stay cached for the next build; clear_materials() removes them when the UI closes.
+        to_delete = []
+        if cmds.objExists('Maze_GRP'): to_delete.append('Maze_GRP')
+
+        if to_delete: cmds.evalDeferred(lambda: cmds.delete(to_delete))
+        M['colors'] = {}
+
+        M['walls'] = {}; M['player'] = None; M['wall_source'] = None
+        M['walls_group'] = None; M['built_wall_mode'] = None; M['finish_node'] = None; M['scene_group'] = None
+        M['chunks'] = {}; M['chunk_proxies'] = {}; M['chunk_state'] = {}; M['lod_center'] = None
 
-    M['walls'].clear(); M['player'] = None; M['map'].clear()
-    M['steps'] = 0; M['finish'] = None
-    M['time_left'] = M['time_limit'] 
+    M['map'] = []
+    M['finish'] = None; M['game'] = None; M['distances'] = None
 
     if not clearOnly and MazeConfigDialog.instance and isValid(MazeConfigDialog.instance):
         dlg = MazeConfigDialog.instance
-        dlg.stepCount_field.setText('0')
+        dlg.stepCount_field.setText('0'); dlg.remaining_field.setText('-')
         if M['mode'] == 'Timed':
             dlg.timeLeft_field.setText(str(M['time_limit']))
         else:
@@ -141,55 +500,58 @@ def resetMaze(clearOnly=False):
         
         cmds.warning('Maze reset.')
 
+@projectStats.timed('move_player')
 def move_player(direction):
-    if not M['player'] or not cmds.objExists(M['player']) or not M['map']:
+    # Rules live in projectUtil.MazeGame; this only mirrors the outcome into the scene and dialog.
+    game = M['game']
+    if game is None:
         cmds.warning("No player or map built.")
         return
-    
-    if M['mode'] == 'Timed' and M['running'] and M['time_left'] <= 0: 
+
+    result = game.step(direction)
+    if result == 'paused':
+        cmds.warning("Game paused. Press P or Resume to continue.")
+        return
+    if result == 'expired':
         cmds.warning("Time is up! Game Over.")
         return
-
-    x, y, z = cmds.xform(M['player'], q=True, ws=True, t=True)
-    
-    dx, dz = 0, 0
-    if direction == "up": dz = -2
-    elif direction == "down": dz = 2
-    elif direction == "left": dx = -2
-    elif direction == "right": dx = 2
-
-    wall_gx, wall_gz = int(round(x + dx // 2)), int(round(z + dz // 2))
-    new_x, new_z = x + dx, z + dz
-    map_size = len(M['map'])
-
-    if 0 <= wall_gz < map_size and 0 <= wall_gx < map_size and M['map'][wall_gz][wall_gx] == 0: 
-        if 0 <= new_z < map_size and 0 <= new_x < map_size:
-            cmds.move(new_x, y, new_z, M['player'])
-            M['steps'] += 1
-
-            if M['mode'] == 'Timed' and M['running']:
-                if M['time_left'] <= 0:
-                    stop_game_timer()
-                    cmds.confirmDialog(t='Game Over', m="Time's up! You did not reach the finish.", b='OK')
-                    resetMaze()
-                    return
-
-            dlg = MazeConfigDialog.instance
-            if dlg and isValid(dlg): dlg.stepCount_field.setText(str(M['steps']))
-
-            if not cmds.objExists('finishSphere'): return
-            
-            FX, FZ = cmds.xform('finishSphere', q=True, ws=True, t=True)[0:3:2]
-            new_gx, new_gz = int(round(new_x)), int(round(new_z))
-            
-            if int(round(FX)) == new_gx and int(round(FZ)) == new_gz:
-                stop_game_timer()
-                cmds.confirmDialog(t="You Win!", m=f"Congratulations! You reached the finish in {M['steps']} steps!", b=["OK"])
-                resetMaze()
-        else:
-            cmds.warning("Cannot move — out of maze boundary!")
-    else:
+    if result == 'wall':
         cmds.warning("Cannot move — wall ahead!")
+        return
+    if result == 'boundary':
+        cmds.warning("Cannot move — out of maze boundary!")
+        return
+
+    cmds.move(game.x, 0.4, game.z, M['player'])
+    update_chunk_visibility(game.x, game.z)
+
+    if result == 'timeout':
+        end_game(game)
+        cmds.confirmDialog(t='Game Over', m="Time's up! You did not reach the finish.", b='OK')
+        resetMaze()
+        return
+
+    dlg = MazeConfigDialog.instance
+    if dlg and isValid(dlg):
+        dlg.stepCount_field.setText(str(game.steps))
+        dlg.remaining_field.setText(str(M['distances'].steps_from(game.x, game.z)))
+        if game.running and game.mode == 'Timed': dlg.timeLeft_field.setText(f"{game.time_left:.1f}")
+
+    if result == 'win':
+        end_game(game)
+        sx, sz = M['start']
+        optimal = M['distances'].steps_from(2 * sx + 1, 2 * sz + 1)
+        cmds.confirmDialog(t="You Win!", m=f"Congratulations! You reached the finish in {game.steps} steps (shortest route: {optimal})!", b=["OK"])
+        resetMaze()
+
+def show_hint():
+    game = M['game']
+    if game is None:
+        cmds.warning("No player or map built.")
+        return
+    # The finish's distance field was solved with the layout, so a hint is a few array reads.
+    direction = M['distances'].next_step(game.x, game.z)
+    if direction: cmds.warning(f"Hint: move {direction}.")
 
 def maya_main_window():
     if omui:
@@ -198,24 +560,150 @@ def maya_main_window():
     return None
 
 
-class MazeConfigDialog(QtWidgets.QDialog):
+# The dialog's whole look as one stylesheet, set once on the dialog: Qt parses it a single time
+# and widgets pick their rules up by type and object name instead of parsing a sheet each.
+DIALOG_STYLE = """
+    * { background-color: #13212E; color: #FFFFFF; }
+    QGroupBox {
+        background-color: #13212E;
+        color: white;
+        border: 2px solid #334D80;
+        border-radius: 8px;
+        margin-top: 1ex;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        subcontrol-position: top left;
+        padding: 0 10px;
+        background-color: #13212E;
+        color: white;
+    }
+    QGroupBox QLineEdit, QGroupBox QComboBox {
+        background-color: #1F3041;
+        border: 1px solid #4A6E9C;
+        color: white;
+        padding: 3px;
+        border-radius: 3px;
+    }
+    #header, #header QLabel { background-color: #334D80; border-radius: 4px; }
+    QLabel#headerText { color: white; font-weight: bold; font-size: 14px; }
+    QFrame#separator { color: #4A6E9C; }
+    QSlider::groove:horizontal {
+        border: 1px solid #4A6E9C;
+        height: 8px;
+        background: #1F3041;
+        margin: 2px 0;
+        border-radius: 4px;
+    }
+    QSlider::handle:horizontal {
+        background: #FFC107;
+        border: 1px solid #FF9800;
+        width: 12px;
+        margin: -2px 0;
+        border-radius: 6px;
+    }
+    QPushButton#fileButton {
+        background-color: #334D80;
+        color: white;
+        padding: 6px;
+        border-radius: 5px;
+        border: 1px solid #4A6E9C;
+    }
+    QPushButton#fileButton:hover { background-color: #4A6E9C; }
+    QPushButton#arrowButton {
+        font-size: 18px;
+        font-weight: bold;
+        padding: 4px;
+        min-width: 25px;
+        min-height: 25px;
+        background-color: #334D80;
+        color: white;
+        border-radius: 4px;
+        border: 1px solid #4A6E9C;
+    }
+    QPushButton#arrowButton:hover { background-color: #4A6E9C; }
+    QPushButton#buildButton, QPushButton#resetButton {
+        color: white;
+        padding: 10px;
+        font-weight: bold;
+        border-radius: 5px;
+    }
+    QPushButton#buildButton { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #4CAF50, stop:1 #FFC107); }
+    QPushButton#buildButton:hover { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #5CB85C, stop:1 #FFD740); }
+    QPushButton#resetButton { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #f44336, stop:1 #FF9800); }
+    QPushButton#resetButton:hover { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #E53935, stop:1 #FFA726); }
+    QPushButton#closeButton {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #2196F3, stop:1 #000000);
+        color: white;
+        padding: 8px;
+        font-weight: bold;
+        border-radius: 5px;
+    }
+    QPushButton#closeButton:hover { background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #1976D2, stop:1 #111111); }
+    QProgressBar {
+        background-color: #1F3041;
+        border: 1px solid #4A6E9C;
+        border-radius: 3px;
+        color: white;
+        text-align: center;
+    }
+    QProgressBar::chunk { background-color: #FFC107; border-radius: 3px; }
+    QPlainTextEdit#statsView { background-color: #1F3041; color: white; font-family: Consolas, monospace; font-size: 10px; }
+"""
+
+_header_pixmap = None
+
+def header_pixmap():
+    # Loaded and scaled on the first dialog, then reused by every dialog after it. None if the
+    # image is missing; the warning is only given once.
+    global _header_pixmap
+    if _header_pixmap is None:
+        _header_pixmap = False
+        if not os.path.exists(IMAGE_PATH):
+            cmds.warning(f"Image file not found at: {IMAGE_PATH}")
+        else:
+            pixmap = QtGui.QPixmap(IMAGE_PATH)
+            if pixmap.isNull():
+                cmds.warning(f"Could not load QPixmap from valid file: {IMAGE_PATH}")
+            else:
+                _header_pixmap = pixmap.scaled(QtCore.QSize(100, 100), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return _header_pixmap or None
+
+_dialog_class = None
+
+def dialog_class():
+    # MazeConfigDialog bound to QDialog. Built on first use so that defining the dialog does not
+    # need Qt; MazeConfigDialog() returns one of these.
+    global _dialog_class
+    if _dialog_class is None:
+        load_qt()
+        class QtMazeConfigDialog(MazeConfigDialog, QtWidgets.QDialog): pass
+        _dialog_class = QtMazeConfigDialog
+    return _dialog_class
+
+
+class MazeConfigDialog:
     instance = None
 
-    def __init__(self, parent=maya_main_window()):
+    def __new__(cls, *args, **kwargs):
+        if cls is MazeConfigDialog: cls = dialog_class()
+        return super().__new__(cls)
+
+    def __init__(self, parent=None):
         if MazeConfigDialog.instance and isValid(MazeConfigDialog.instance):
             MazeConfigDialog.instance.close()
             
-        super().__init__(parent)
+        super().__init__(parent or maya_main_window())
         self.setWindowTitle("Maze Escape Game")
         self.resize(320, 700)
 
-        self.setStyleSheet("background-color: #13212E; color: #FFFFFF;")
+        self.setStyleSheet(DIALOG_STYLE)
         
         MazeConfigDialog.instance = self
         stop_game_timer() 
 
         self.qt_timer = QtCore.QTimer()
-        self.qt_timer.setInterval(1000)
+        self.qt_timer.setInterval(CLOCK_REFRESH_MS)
         M['timer'] = self.qt_timer 
 
         self.mainLayout = QtWidgets.QVBoxLayout(self)
@@ -223,73 +711,30 @@ class MazeConfigDialog(QtWidgets.QDialog):
         self.setFocusPolicy(Qt.StrongFocus)
 
     def setup_ui(self):
-        group_style = """
-            QGroupBox {
-                background-color: #13212E; 
-                color: white; 
-                border: 2px solid #334D80; 
-                border-radius: 8px; 
-                margin-top: 1ex; 
-            } 
-            QGroupBox::title { 
-                subcontrol-origin: margin; 
-                subcontrol-position: top left; 
-                padding: 0 10px; 
-                background-color: #13212E; 
-                color: white; 
-            }
-            QLineEdit, QComboBox {
-                background-color: #1F3041; 
-                border: 1px solid #4A6E9C;
-                color: white;
-                padding: 3px;
-                border-radius: 3px;
-            }
-        """
-
         header_widget = QtWidgets.QWidget() 
+        header_widget.setObjectName('header')
         header_layout = QtWidgets.QVBoxLayout(header_widget)
         header_layout.setContentsMargins(8, 8, 8, 8)
         header_layout.setAlignment(Qt.AlignCenter)
 
-        image_label = QtWidgets.QLabel()
-        try:
-            if not os.path.exists(IMAGE_PATH):
-                raise FileNotFoundError(f"Image file not found at: {IMAGE_PATH}")
-                
-            imagePixmap = QtGui.QPixmap(IMAGE_PATH)
-            
-            if not imagePixmap.isNull():
-                scaled_pixmap = imagePixmap.scaled(
-                    QtCore.QSize(100, 100),
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation
-                )
-                image_label.setPixmap(scaled_pixmap)
-                image_label.setAlignment(Qt.AlignCenter)
-                header_layout.addWidget(image_label)
-            else:
-                cmds.warning(f"Could not load QPixmap from valid file: {IMAGE_PATH}")
-                header_layout.addSpacing(100)
-                
-        except FileNotFoundError as e:
-            cmds.warning(f"Warning: {e}")
-            header_layout.addSpacing(100) 
-        except Exception as e:
-            cmds.warning(f"Error loading image: {e}")
+        pixmap = header_pixmap()
+        if pixmap:
+            image_label = QtWidgets.QLabel()
+            image_label.setPixmap(pixmap)
+            image_label.setAlignment(Qt.AlignCenter)
+            header_layout.addWidget(image_label)
+        else:
             header_layout.addSpacing(100)
 
         header_text = QtWidgets.QLabel("Build your maze")
-        header_text.setStyleSheet("color:white;font-weight:bold;font-size:14px;")
+        header_text.setObjectName('headerText')
         header_text.setAlignment(Qt.AlignCenter) 
         header_layout.addWidget(header_text)
 
-        header_widget.setStyleSheet("background-color:#334D80;border-radius:4px;")
         self.mainLayout.addWidget(header_widget)
 
 
         mode_group = QtWidgets.QGroupBox("Select Mode:")
-        mode_group.setStyleSheet(group_style) 
         h = QtWidgets.QHBoxLayout(mode_group)
         self.mode_normal_radio = QtWidgets.QRadioButton("Normal")
         self.mode_timed_radio = QtWidgets.QRadioButton("Timed")
@@ -299,11 +744,48 @@ class MazeConfigDialog(QtWidgets.QDialog):
         self.mainLayout.addWidget(mode_group)
 
         self.size_field = QtWidgets.QLineEdit(str(M['size']))
-        self.size_slider = self._create_slider_group("Maze Size (N):", self.size_field, 3, 25, M['size'], int)
+        self.size_slider = self._create_slider_group("Maze Size (N):", self.size_field, 3, MAX_MAZE_SIZE, M['size'], int)
         self.mainLayout.addLayout(self.size_slider)
 
+        algorithm_layout = QtWidgets.QHBoxLayout()
+        algorithm_layout.addWidget(QtWidgets.QLabel("Algorithm:"))
+        self.algorithm_combo = QtWidgets.QComboBox()
+        self.algorithm_options = [
+            ("Recursive Backtracker", 'backtracker'), ("Binary Tree (fast)", 'binary_tree'),
+            ("Sidewinder (fast)", 'sidewinder'), ("Eller (low memory)", 'eller')
+        ]
+        for name, key in self.algorithm_options:
+            self.algorithm_combo.addItem(name, key)
+        self.algorithm_combo.setCurrentIndex(self.algorithm_combo.findData(M['algorithm']))
+        self.algorithm_combo.currentIndexChanged.connect(self.on_algorithm_change)
+        algorithm_layout.addWidget(self.algorithm_combo)
+        self.mainLayout.addLayout(algorithm_layout)
+
+        seed_layout = QtWidgets.QHBoxLayout()
+        seed_layout.addWidget(QtWidgets.QLabel("Seed:"))
+        self.seed_field = QtWidgets.QLineEdit()
+        self.seed_field.setPlaceholderText("random")
+        self.seed_field.setToolTip("Empty builds a new maze every time; a seed rebuilds the same maze, from the cache when it is known")
+        seed_layout.addWidget(self.seed_field)
+        self.mainLayout.addLayout(seed_layout)
+
+        wall_mode_layout = QtWidgets.QHBoxLayout()
+        wall_mode_layout.addWidget(QtWidgets.QLabel("Wall Build:"))
+        self.wall_mode_combo = QtWidgets.QComboBox()
+        self.wall_mode_options = [
+            ("Merged Rectangles", 'rectangles'), ("Merged Strips", 'strips'), ("Combined Mesh per Chunk", 'combined'),
+            ("Instanced Cubes", 'instanced'), ("Cube per Cell (legacy)", 'cubes')
+        ]
+        for name, key in self.wall_mode_options:
+            self.wall_mode_combo.addItem(name, key)
+        self.wall_mode_combo.setCurrentIndex(self.wall_mode_combo.findData(M['wall_mode']))
+        self.wall_mode_combo.currentIndexChanged.connect(self.on_wall_mode_change)
+        wall_mode_layout.addWidget(self.wall_mode_combo)
+        self.mainLayout.addLayout(wall_mode_layout)
+
         self.height_field = QtWidgets.QLineEdit(str(M['wall_height']))
         self.height_slider = self._create_slider_group("Wall Height:", self.height_field, 5, 50, int(M['wall_height'] * 10), float, 10)
+        self.height_field.textChanged.connect(self.on_height_change)
         self.mainLayout.addLayout(self.height_slider)
 
         color_layout = QtWidgets.QHBoxLayout()
@@ -321,121 +803,184 @@ class MazeConfigDialog(QtWidgets.QDialog):
         self.mainLayout.addLayout(color_layout)
 
         start_group = QtWidgets.QGroupBox("Start Position (Grid Index 0..N-1):")
-        start_group.setStyleSheet(group_style) 
         s_layout = QtWidgets.QHBoxLayout(start_group)
         self.start_x = QtWidgets.QLineEdit(str(M['start'][0])); self.start_z = QtWidgets.QLineEdit(str(M['start'][1]))
-        self.start_x.setValidator(QIntValidator(0, 99)); self.start_z.setValidator(QIntValidator(0, 99))
+        self.start_x.setValidator(QIntValidator(0, MAX_MAZE_SIZE - 1)); self.start_z.setValidator(QIntValidator(0, MAX_MAZE_SIZE - 1))
         s_layout.addWidget(QtWidgets.QLabel("X:")); s_layout.addWidget(self.start_x)
         s_layout.addWidget(QtWidgets.QLabel("Z:")); s_layout.addWidget(self.start_z)
+        self.start_x.editingFinished.connect(self.on_start_change); self.start_z.editingFinished.connect(self.on_start_change)
         self.mainLayout.addWidget(start_group)
 
+        difficulty_layout = QtWidgets.QHBoxLayout()
+        difficulty_layout.addWidget(QtWidgets.QLabel("Difficulty:"))
+        self.difficulty_combo = QtWidgets.QComboBox()
+        self.difficulty_options = [
+            ("Random Finish", None), ("Easy", 0.25), ("Medium", 0.5), ("Hard", 0.75), ("Farthest", 1.0)
+        ]
+        for name, value in self.difficulty_options:
+            self.difficulty_combo.addItem(name, value)
+        self.difficulty_combo.setCurrentIndex(self.difficulty_combo.findData(M['difficulty']))
+        self.difficulty_combo.currentIndexChanged.connect(self.on_difficulty_change)
+        difficulty_layout.addWidget(self.difficulty_combo)
+        self.mainLayout.addLayout(difficulty_layout)
+
+        lod_layout = QtWidgets.QHBoxLayout()
+        lod_layout.addWidget(QtWidgets.QLabel("Distant Walls:"))
+        self.lod_combo = QtWidgets.QComboBox()
+        self.lod_options = [("Hidden", 'hide'), ("Low-Poly Proxy", 'proxy'), ("Always Shown", None)]
+        for name, key in self.lod_options:
+            self.lod_combo.addItem(name, key)
+        self.lod_combo.setCurrentIndex(self.lod_combo.findData(M['lod']))
+        self.lod_combo.setToolTip(f"Walls more than {CHUNK_VIEW_RADIUS} chunks ({CHUNK_SIZE // 2}x{CHUNK_SIZE // 2} cells) from the player")
+        self.lod_combo.currentIndexChanged.connect(self.on_lod_change)
+        lod_layout.addWidget(self.lod_combo)
+        self.mainLayout.addLayout(lod_layout)
+
         self.mainLayout.addWidget(self._create_separator())
 
         self.build_button = QtWidgets.QPushButton("Build Maze (Start Game)")
-        self.build_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #4CAF50, stop:1 #FFC107);
-                color: white;
-                padding: 10px;
-                font-weight: bold;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #5CB85C, stop:1 #FFD740);
-            }
-        """)
+        self.build_button.setObjectName('buildButton')
         self.build_button.clicked.connect(self.build_maze_action)
 
         self.reset_button = QtWidgets.QPushButton("Reset Game & Scene")
-        self.reset_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #f44336, stop:1 #FF9800);
-                color: white;
-                padding: 10px;
-                font-weight: bold;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #E53935, stop:1 #FFA726);
-            }
-        """)
+        self.reset_button.setObjectName('resetButton')
         self.reset_button.clicked.connect(lambda: resetMaze())
 
         btn_layout = QtWidgets.QHBoxLayout()
         btn_layout.addWidget(self.build_button); btn_layout.addWidget(self.reset_button)
         self.mainLayout.addLayout(btn_layout)
 
+        self.save_button = self._create_button("Save Maze", self.save_maze_action)
+        self.load_button = self._create_button("Load Maze", self.load_maze_action)
+
+        file_btn_layout = QtWidgets.QHBoxLayout()
+        file_btn_layout.addWidget(self.save_button); file_btn_layout.addWidget(self.load_button)
+        self.mainLayout.addLayout(file_btn_layout)
+
+        self.save_replay_button = self._create_button("Save Replay", self.save_replay_action)
+        self.verify_replay_button = self._create_button("Verify Replay", self.verify_replay_action)
+        self.save_replay_button.setToolTip("Save the run in progress, or the last finished one")
+        replay_btn_layout = QtWidgets.QHBoxLayout()
+        replay_btn_layout.addWidget(self.save_replay_button); replay_btn_layout.addWidget(self.verify_replay_button)
+        self.mainLayout.addLayout(replay_btn_layout)
+
+        self.build_progress = QtWidgets.QProgressBar()
+        self.cancel_build_button = self._create_button("Cancel", self.cancel_build_action)
+
+        progress_layout = QtWidgets.QHBoxLayout()
+        progress_layout.addWidget(self.build_progress); progress_layout.addWidget(self.cancel_build_button)
+        self.mainLayout.addLayout(progress_layout)
+        self.show_build_progress(False)
+
+        self.build_timer = QtCore.QTimer(self)
+        self.build_timer.timeout.connect(self._build_tick)
+
         self.mainLayout.addWidget(self._create_separator())
 
         stats_group = QtWidgets.QGroupBox("Game Status:")
-        stats_group.setStyleSheet(group_style) 
         form = QtWidgets.QFormLayout(stats_group)
 
         self.stepCount_field = QtWidgets.QLineEdit("0"); self.stepCount_field.setReadOnly(True); self.stepCount_field.setAlignment(Qt.AlignRight)
         self.timeLeft_field = QtWidgets.QLineEdit("-"); self.timeLeft_field.setReadOnly(True); self.timeLeft_field.setAlignment(Qt.AlignRight)
+        self.remaining_field = QtWidgets.QLineEdit("-"); self.remaining_field.setReadOnly(True); self.remaining_field.setAlignment(Qt.AlignRight)
         
         form.addRow("Steps Taken:", self.stepCount_field); form.addRow("Time Left (s):", self.timeLeft_field)
+        form.addRow("Steps to Finish:", self.remaining_field)
+        self.pause_button = self._create_button("Pause", self.toggle_pause)
+        self.pause_button.setToolTip(f"Timed mode: pause the clock (P). Each step costs {TIME_PENALTY_PER_STEP}s.")
+        form.addRow(self.pause_button)
         self.mainLayout.addWidget(stats_group)
 
         self.mainLayout.addWidget(self._create_separator())
 
         control_group = QtWidgets.QGroupBox("Move Player (Arrows):")
-        control_group.setStyleSheet(group_style)
         control_layout = QtWidgets.QGridLayout(control_group)
 
-        btn_style = """
-            QPushButton {
-                font-size: 18px; 
-                font-weight: bold; 
-                padding: 4px; 
-                min-width: 25px; 
-                min-height: 25px;
-                background-color: #334D80; 
-                color: white; 
-                border-radius: 4px;
-                border: 1px solid #4A6E9C;
-            }
-            QPushButton:hover {
-                background-color: #4A6E9C;
-            }
-        """
-
-        self.up_btn = QtWidgets.QPushButton("↑"); self.down_btn = QtWidgets.QPushButton("↓")
-        self.left_btn = QtWidgets.QPushButton("←"); self.right_btn = QtWidgets.QPushButton("→")
-        self.up_btn.setStyleSheet(btn_style); self.down_btn.setStyleSheet(btn_style)
-        self.left_btn.setStyleSheet(btn_style); self.right_btn.setStyleSheet(btn_style)
+        self.up_btn = self._create_button("↑", lambda: move_player("up"), 'arrowButton')
+        self.down_btn = self._create_button("↓", lambda: move_player("down"), 'arrowButton')
+        self.left_btn = self._create_button("←", lambda: move_player("left"), 'arrowButton')
+        self.right_btn = self._create_button("→", lambda: move_player("right"), 'arrowButton')
 
         control_layout.addWidget(self.up_btn, 0, 1); control_layout.addWidget(self.left_btn, 1, 0)
         control_layout.addWidget(self.right_btn, 1, 2); control_layout.addWidget(self.down_btn, 2, 1)
 
-        self.up_btn.clicked.connect(lambda: move_player("up"))
-        self.down_btn.clicked.connect(lambda: move_player("down"))
-        self.left_btn.clicked.connect(lambda: move_player("left"))
-        self.right_btn.clicked.connect(lambda: move_player("right"))
+        self.hint_btn = self._create_button("?", show_hint, 'arrowButton')
+        self.hint_btn.setToolTip("Show the next move on the shortest route")
+        control_layout.addWidget(self.hint_btn, 1, 1)
 
         self.mainLayout.addWidget(control_group)
+
+        # Crowd and Performance panels are only built the first time they are opened.
+        self.tools_button = self._create_button("Crowd && Performance Tools ▸", self.toggle_tools)
+        self.tools_button.setCheckable(True)
+        self.mainLayout.addWidget(self.tools_button)
+        self.tools_widget = None
+        self.crowd_button = None
+
+        self.crowd_timer = QtCore.QTimer(self)
+        self.crowd_timer.setInterval(CROWD_TICK_MS)
+        self.crowd_timer.timeout.connect(self._crowd_tick)
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+
         close_button = QtWidgets.QPushButton("Close UI")
-        close_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #2196F3, stop:1 #000000);
-                color: white;
-                padding: 8px;
-                font-weight: bold;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #1976D2, stop:1 #111111);
-            }
-        """)
+        close_button.setObjectName('closeButton')
         close_button.clicked.connect(self.close)
         self.mainLayout.addWidget(close_button)
         self.mainLayout.addStretch()
 
+    def setup_tools(self):
+        self.tools_widget = QtWidgets.QWidget()
+        tools_layout = QtWidgets.QVBoxLayout(self.tools_widget)
+        tools_layout.setContentsMargins(0, 0, 0, 0)
+
+        crowd_group = QtWidgets.QGroupBox("Crowd Simulation:")
+        crowd_layout = QtWidgets.QHBoxLayout(crowd_group)
+        self.crowd_field = QtWidgets.QLineEdit("1000"); self.crowd_field.setValidator(QIntValidator(1, 1000000))
+        self.crowd_field.setToolTip("Agents random-walking the built maze")
+        self.crowd_status = QtWidgets.QLabel("-")
+        self.crowd_button = self._create_button("Stop Crowd" if M['crowd'] else "Start Crowd", self.toggle_crowd)
+        crowd_layout.addWidget(QtWidgets.QLabel("Agents:")); crowd_layout.addWidget(self.crowd_field)
+        crowd_layout.addWidget(self.crowd_status); crowd_layout.addWidget(self.crowd_button)
+        tools_layout.addWidget(crowd_group)
+
+        perf_group = QtWidgets.QGroupBox("Performance:")
+        perf_layout = QtWidgets.QVBoxLayout(perf_group)
+        perf_toggles = QtWidgets.QHBoxLayout()
+        self.instrument_check = QtWidgets.QCheckBox("Instrument"); self.profile_check = QtWidgets.QCheckBox("cProfile")
+        self.instrument_check.setToolTip("Time the hot paths and count DCC calls")
+        self.profile_check.setToolTip("Capture a cProfile run; the report is printed when unchecked")
+        self.instrument_check.toggled.connect(self.on_instrument_toggle)
+        self.profile_check.toggled.connect(self.on_profile_toggle)
+        stats_reset_button = self._create_button("Reset", self.on_stats_reset)
+        perf_toggles.addWidget(self.instrument_check); perf_toggles.addWidget(self.profile_check)
+        perf_toggles.addWidget(stats_reset_button)
+        perf_layout.addLayout(perf_toggles)
+        self.stats_view = QtWidgets.QPlainTextEdit(); self.stats_view.setReadOnly(True)
+        self.stats_view.setObjectName('statsView')
+        self.stats_view.setFixedHeight(110); self.stats_view.setVisible(False)
+        perf_layout.addWidget(self.stats_view)
+        tools_layout.addWidget(perf_group)
+
+        self.mainLayout.insertWidget(self.mainLayout.indexOf(self.tools_button) + 1, self.tools_widget)
+
+    def toggle_tools(self, checked):
+        if checked and self.tools_widget is None: self.setup_tools()
+        if self.tools_widget is not None: self.tools_widget.setVisible(checked)
+        self.tools_button.setText("Crowd && Performance Tools " + ("▾" if checked else "▸"))
+
+    def _create_button(self, text, slot, name='fileButton'):
+        button = QtWidgets.QPushButton(text)
+        button.setObjectName(name)
+        button.clicked.connect(slot)
+        return button
+
     def _create_separator(self):
         s = QtWidgets.QFrame()
         s.setFrameShape(QtWidgets.QFrame.HLine)
         s.setFrameShadow(QtWidgets.QFrame.Sunken)
-        s.setStyleSheet("color: #4A6E9C;") 
+        s.setObjectName('separator')
         s.setLineWidth(1)
         return s
 
@@ -446,22 +991,6 @@ class MazeConfigDialog(QtWidgets.QDialog):
         layout.addWidget(label_widget)
         
         slider = QtWidgets.QSlider(Qt.Horizontal)
-        slider.setStyleSheet("""
-            QSlider::groove:horizontal {
-                border: 1px solid #4A6E9C;
-                height: 8px; 
-                background: #1F3041;
-                margin: 2px 0;
-                border-radius: 4px;
-            }
-            QSlider::handle:horizontal {
-                background: #FFC107;
-                border: 1px solid #FF9800;
-                width: 12px;
-                margin: -2px 0; 
-                border-radius: 6px;
-            }
-        """)
 
         slider.setMinimum(min_val); slider.setMaximum(max_val); slider.setValue(val)
         field.setFixedWidth(50); field.setAlignment(Qt.AlignRight)
@@ -486,11 +1015,72 @@ class MazeConfigDialog(QtWidgets.QDialog):
         
     def on_color_change(self, index):
         M['player_color'] = self.color_combo.itemData(index)
-        if M['player'] and cmds.objExists(M['player']):
-            create_and_assign_color_material(M['player'], M['player_color'], 'playerMat')
+        if M['player']: assign_color([M['player']], M['player_color'])
+
+    def on_algorithm_change(self, index):
+        M['algorithm'] = self.algorithm_combo.itemData(index)
+
+    def on_wall_mode_change(self, index):
+        M['wall_mode'] = self.wall_mode_combo.itemData(index)
+
+    def on_difficulty_change(self, index):
+        M['difficulty'] = self.difficulty_combo.itemData(index)
+
+    def on_instrument_toggle(self, checked):
+        set_instrumentation(checked)
+        self.stats_view.setVisible(checked)
+        if checked: self.stats_timer.start(); self.refresh_stats()
+        else: self.stats_timer.stop()
+
+    def on_profile_toggle(self, checked):
+        if checked:
+            projectStats.start_profile()
+            return
+        report = projectStats.stop_profile()
+        print(report)
+        cmds.warning("cProfile report printed to the Script Editor.")
+
+    def on_stats_reset(self):
+        projectStats.STATS.reset()
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        if not isValid(self): return
+        report = projectStats.STATS.report() or "No samples yet."
+        self.stats_view.setPlainText(f"{report}\n\n{projectCache.MAZES.report()}")
+
+    def on_lod_change(self, index):
+        M['lod'] = self.lod_combo.itemData(index)
+        if M['game']: update_chunk_visibility(M['game'].x, M['game'].z, force=True)
+
+    def on_height_change(self, text):
+        # Applied to the built maze straight away, no rebuild.
+        try:
+            H = float(text)
+        except ValueError:
+            return
+        if H > 0: set_wall_height(H)
+
+    def on_start_change(self):
+        # A new start on a built maze keeps the layout: only the player moves and play restarts.
+        game = M['game']
+        if game is None: return
+        try:
+            start = (int(self.start_x.text()), int(self.start_z.text()))
+        except ValueError:
+            return
+        N = game.S // 2
+        if not (0 <= start[0] < N and 0 <= start[1] < N) or start in (M['start'], M['finish']): return
+        stop_game_timer()
+        # The run being replaced is recorded like one ended by resetMaze.
+        if game.moves: M['last_replay'] = make_replay(game)
+        self.start_game(start)
 
     def closeEvent(self, event):
+        self.stats_timer.stop(); set_instrumentation(False)
+        if projectStats.STATS.profiler: projectStats.stop_profile()
         resetMaze() 
+        clear_materials()
         MazeConfigDialog.instance = None
         super().closeEvent(event)
 
@@ -500,7 +1090,7 @@ class MazeConfigDialog(QtWidgets.QDialog):
             self.set_time_limit()
         else:
             M['mode'] = 'Normal'
-            M['time_limit'] = 0; M['time_left'] = 0
+            M['time_limit'] = 0
             self.timeLeft_field.setText('-')
             
         stop_game_timer()
@@ -512,7 +1102,7 @@ class MazeConfigDialog(QtWidgets.QDialog):
         
         if dialog.exec() == QtWidgets.QDialog.Accepted:
             t = dialog.intValue()
-            M['time_limit'] = M['time_left'] = t
+            M['time_limit'] = t
             self.timeLeft_field.setText(str(t))
         else:
             self.mode_normal_radio.setChecked(True); M['mode'] = 'Normal'
@@ -520,109 +1110,307 @@ class MazeConfigDialog(QtWidgets.QDialog):
 
     def build_maze_action(self):
 
-        resetMaze(clearOnly=True) 
+        resetMaze(clearOnly=True, keepScene=True)
         
         try:
             N = int(self.size_field.text())
             H = float(self.height_field.text())
             SX = int(self.start_x.text())
             SZ = int(self.start_z.text())
+            seed_text = self.seed_field.text().strip()
+            seed = int(seed_text) if seed_text else random.randrange(1 << 32)
         except ValueError:
-            cmds.warning("Invalid input. Please check Maze Size, Wall Height, and Start Position.")
+            cmds.warning("Invalid input. Please check Maze Size, Wall Height, Seed, and Start Position.")
             return
 
+        if not (3 <= N <= MAX_MAZE_SIZE):
+            cmds.warning(f"Maze Size must be 3..{MAX_MAZE_SIZE}.")
+            return
         if not (0 <= SX < N and 0 <= SZ < N):
             cmds.warning(f"Start coords must be 0..{N-1}.")
             return
+        if not (0 <= seed < 1 << 64):
+            cmds.warning("Seed must be 0..2^64-1.")
+            return
 
-        M['map'] = generateMaze(N)
-        map_s = len(M['map']) 
-        walls_group = cmds.group(empty=True, name='Maze_Walls_GRP')
-
-        create_and_assign_color_material(walls_group, 4, 'wallMat')
-
-        for z in range(map_s):
-            for x in range(map_s):
-                if M['map'][z][x] == 1:
-                    w = cmds.polyCube(w=1, h=H, d=1, n=f'wall_{x}_{z}')[0]
-                    cmds.move(x, H / 2.0, z, w)
-                    M['walls'].append(w)
-                    cmds.parent(w, walls_group) 
-
-        PX, PZ = SX * 2 + 1, SZ * 2 + 1
-        M['start'] = (SX, SZ)
+        M['seed'] = seed; M['maze_algorithm'] = M['algorithm']
+        self.seed_field.setPlaceholderText(f"random (last: {seed})")
+        self.start_build(H, prepare_maze, N, M['algorithm'], M['seed'], (SX, SZ), M['difficulty'], M['wall_mode'], bool(seed_text))
+
+    def start_build(self, H, prepare, *args):
+        # prepare(*args) runs on the worker thread; _build_tick picks its layout up and populates
+        # the scene a slice at a time, so the dialog and the game timer keep running.
+        M['build'] = {'future': build_executor().submit(prepare, *args), 'job': None, 'height': H, 'start': None}
+        self.build_progress.setRange(0, 0)
+        self.show_build_progress(True)
+        self.build_timer.start(50) # Polls the worker without competing with it for the GIL.
+
+    def show_build_progress(self, visible):
+        self.build_progress.setVisible(visible); self.cancel_build_button.setVisible(visible)
+
+    def cancel_build_action(self):
+        if M['build'] is None: return
+        resetMaze(clearOnly=True, keepScene=True)
+        cmds.warning("Build cancelled.")
+
+    def _build_tick(self):
+        build = M['build']
+        if build is None or not isValid(self):
+            stop_build()
+            return
 
-        available_cells = [(i, j) for i in range(N) for j in range(N) if (i, j) != (SX, SZ)]
-        if not available_cells:
-            cmds.warning("Maze too small. Increase N.")
+        future = build['future']
+        if future is not None:
+            if not future.done(): return
+            build['future'] = None
+            try:
+                layout = future.result()
+            except Exception as e:
+                stop_build()
+                cmds.warning(f"Maze build failed: {e}")
+                return
+            if layout is None:
+                stop_build()
+                cmds.warning("Maze too small. Increase N.")
+                return
+            try:
+                build['job'] = self.build_scene(layout, build['height'])
+            except Exception as e:
+                stop_build()
+                cmds.warning(f"Maze build failed: {e}")
+                return
+            build['start'] = layout['start']
+            self.build_progress.setRange(0, 100)
+            self.build_timer.setInterval(0)
+
+        job = build['job']
+        try:
+            done = job.step()
+        except Exception as e:
+            stop_build()
+            cmds.warning(f"Maze build failed after {job.created} of {len(job.todo)} walls: {e}")
             return
+        # The first slice holds the walls nearest the player, so play can start right away.
+        if M['game'] is None: self.start_game(build['start'])
+        self.build_progress.setValue(int(job.progress * 100))
+        if not done: return
+
+        stop_build()
+        M['build_stats'] = {'mode': job.mode, 'nodes': len(M['walls']) + bool(M['wall_source']),
+                            'created': job.created, 'deleted': job.deleted, 'seconds': job.seconds}
+        stats = M['build_stats']
+        cmds.warning(f"Maze built successfully! Walls: {stats['nodes']} nodes ({stats['mode']}, {stats['created']} new, "
+                     f"{stats['deleted']} removed) in {stats['seconds']:.3f}s. Use WASD or Arrow Keys to move.")
+
+    @projectStats.timed('build.scene')
+    def build_scene(self, layout, H):
+        # Main-thread part of a build for a prepare_layout result: reuses or creates the walls group,
+        # spheres and materials and returns the SceneBuild that adds the walls. Only the
+        # bit-packed MazeGrid is kept in M['map'].
+        M['map'] = layout['map']; M['finish'] = layout['finish']; M['distances'] = layout['distances']
+
+        walls_group = M['walls_group']
+        if not (walls_group and cmds.objExists(walls_group)):
+            walls_group = M['walls_group'] = cmds.group(empty=True, name='Maze_Walls_GRP')
+            M['walls'] = {}; M['wall_source'] = None
+            M['chunks'] = {}; M['chunk_proxies'] = {}; M['chunk_state'] = {}
+        set_wall_height(H)
+        # Proxies are cheap and sized to the old maze, so they are simply recreated on demand.
+        if M['chunk_proxies']: cmds.delete(*M['chunk_proxies'].values())
+        M['chunk_proxies'] = {}; M['chunk_state'] = {}
+
+        deleted = 0
+        if M['built_wall_mode'] != layout['mode']:
+            # Boxes of another wall mode never match, so there is nothing to diff against.
+            stale = list(M['walls'].values()) + ([M['wall_source']] if M['wall_source'] else [])
+            if stale: cmds.delete(*stale)
+            deleted = len(stale)
+            M['walls'] = {}; M['wall_source'] = None
+        M['built_wall_mode'] = layout['mode']
+        job = SceneBuild(layout['plan'], layout['mode'])
+        job.deleted += deleted
+        chunk_count = -(-layout['map'].S // CHUNK_SIZE)
+        outside = [chunk for chunk in M['chunks'] if chunk[0] >= chunk_count or chunk[1] >= chunk_count]
+        if outside: cmds.delete(*[M['chunks'].pop(chunk) for chunk in outside])
+        update_chunk_visibility(layout['start'][0] * 2 + 1, layout['start'][1] * 2 + 1, force=True)
+
+        FX, FZ = layout['finish'][0] * 2 + 1, layout['finish'][1] * 2 + 1
+
+        # A sphere deleted in the scene comes back under the same name, so its color entry is stale.
+        if not (M['player'] and cmds.objExists(M['player'])):
+            M['player'] = cmds.polySphere(r=0.4, n='playerBall')[0]
+            M['colors'].pop(M['player'], None)
+        assign_color([M['player']], M['player_color'])
+
+        if not (M['finish_node'] and cmds.objExists(M['finish_node'])):
+            M['finish_node'] = cmds.polySphere(r=0.4, n='finishSphere')[0]
+            M['colors'].pop(M['finish_node'], None)
+        assign_color([M['finish_node']], FINISH_COLOR)
+        cmds.move(FX, 0.4, FZ, M['finish_node'])
+
+        if not (M['scene_group'] and cmds.objExists(M['scene_group'])):
+            M['scene_group'] = cmds.group(M['player'], M['finish_node'], walls_group, name='Maze_GRP')
+        cmds.select(M['player'], replace=True)
+        return job
 
-        M['finish'] = random.choice(available_cells)
+    def start_game(self, start):
+        # Puts the player on a start cell of the built maze and starts a fresh game there.
+        M['start'] = start
+        PX, PZ = start[0] * 2 + 1, start[1] * 2 + 1
         FX, FZ = M['finish'][0] * 2 + 1, M['finish'][1] * 2 + 1
-
-        M['player'] = cmds.polySphere(r=0.4, n='playerBall')[0]
         cmds.move(PX, 0.4, PZ, M['player'])
-        create_and_assign_color_material(M['player'], M['player_color'], 'playerMat')
-
-        finish_sphere = cmds.polySphere(r=0.4, n='finishSphere')[0]
-        cmds.move(FX, 0.4, FZ, finish_sphere)
-        create_and_assign_color_material(finish_sphere, 13, 'finishMat') # Red
-
-        cmds.group(M['player'], 'finishSphere', walls_group, name='Maze_GRP')
-        cmds.select(M['player'], replace=True)
-
-        cmds.warning('Maze built successfully! Use WASD or Arrow Keys to move.')
+        update_chunk_visibility(PX, PZ)
+        M['game'] = projectUtil.MazeGame(M['map'], (PX, PZ), (FX, FZ), M['mode'], M['time_limit'], TIME_PENALTY_PER_STEP)
+        self.pause_button.setText("Pause")
 
-        M['steps'] = 0
         self.stepCount_field.setText('0')
+        self.remaining_field.setText(str(M['distances'].steps_from(PX, PZ)))
         
         if M['mode'] == 'Timed' and M['time_limit'] > 0:
-            M['time_left'] = M['time_limit'] 
-            self.timeLeft_field.setText(str(M['time_left']))
+            self.timeLeft_field.setText(str(M['time_limit']))
             self.start_timer()
 
+    def save_maze_action(self):
+        game = M['game']
+        if game is None:
+            cmds.warning("No maze built to save.")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Maze", "", MAZE_FILE_FILTER)
+        if not path: return
+        try:
+            projectIO.save_maze(path, game.grid, game.S // 2, M['seed'], M['maze_algorithm'], M['start'], M['finish'])
+        except OSError as e:
+            cmds.warning(f"Could not save maze: {e}")
+            return
+        cmds.warning(f"Maze saved to {path}")
+
+    def load_maze_action(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Maze", "", MAZE_FILE_FILTER)
+        if not path: return
+        try:
+            grid, N, seed, algorithm, start, finish = projectIO.load_maze(path)
+        except (OSError, ValueError) as e:
+            cmds.warning(f"Could not load maze: {e}")
+            return
+        if start is None or finish is None:
+            cmds.warning("Maze file has no start or finish position.")
+            return
+        try:
+            H = float(self.height_field.text())
+        except ValueError:
+            H = M['wall_height']
+
+        resetMaze(clearOnly=True, keepScene=True)
+        M['seed'], M['algorithm'], M['maze_algorithm'] = seed, algorithm, algorithm
+        self.size_field.setText(str(N))
+        self.start_x.setText(str(start[0])); self.start_z.setText(str(start[1]))
+        self.start_build(H, prepare_loaded, grid, N, seed, algorithm, start, finish, M['wall_mode'])
+
+    def save_replay_action(self):
+        game = M['game']
+        replay = make_replay(game) if game is not None and game.moves else M['last_replay']
+        if replay is None:
+            cmds.warning("No recorded run to save. Replays need a generated maze with a seed.")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Replay", "", REPLAY_FILE_FILTER)
+        if not path: return
+        try:
+            projectIO.save_replay(path, replay)
+        except OSError as e:
+            cmds.warning(f"Could not save replay: {e}")
+            return
+        cmds.warning(f"Replay of {replay.steps} steps saved to {path}")
+
+    def verify_replay_action(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Verify Replay", "", REPLAY_FILE_FILTER)
+        if not path: return
+        try:
+            replay = projectIO.load_replay(path)
+        except (OSError, ValueError) as e:
+            cmds.warning(f"Could not load replay: {e}")
+            return
+        problem = projectIO.verify_replay(replay)
+        claim = f"{replay.steps} steps, {replay.outcome or 'unfinished'} ({replay.mode}, {replay.N}x{replay.N} {replay.algorithm})"
+        if problem: cmds.confirmDialog(t='Replay Rejected', m=f"{claim}\n{problem}", b='OK')
+        else: cmds.confirmDialog(t='Replay Verified', m=claim, b='OK')
+
+    @projectStats.timed('tick_timer')
     def _tick_timer(self):
-        if not isValid(self) or not M['player'] or not cmds.objExists(M['player']) or not M['running']:
+        game = M['game']
+        if not isValid(self) or game is None or not game.running:
             stop_game_timer()
             if isValid(self): self.timeLeft_field.setText('GAME STOPPED')
             return
 
-        M['time_left'] -= 1
-        self.timeLeft_field.setText(str(M['time_left']))
+        result = game.tick()
+        self.timeLeft_field.setText(f"{game.time_left:.1f}")
         
-        if M['time_left'] <= 0:
-            stop_game_timer()
-            
-            current_x, _, current_z = cmds.xform(M['player'], q=True, ws=True, t=True)
+        if result != 'running':
+            end_game(game)
             
-            if cmds.objExists('finishSphere'):
-                FX, FZ = cmds.xform('finishSphere', q=True, ws=True, t=True)[0:3:2]
-            else:
-                FX, FZ = -999, -999
-
-            if int(round(FX)) == int(round(current_x)) and int(round(FZ)) == int(round(current_z)):
-                cmds.confirmDialog(t="You Win!", m=f"Congratulations! You reached the finish in {M['steps']} steps!", b=["OK"])
+            if result == 'win':
+                cmds.confirmDialog(t="You Win!", m=f"Congratulations! You reached the finish in {game.steps} steps!", b=["OK"])
             else:
                 cmds.confirmDialog(t='Game Over', m="Time's up! You did not reach the finish.", b='OK')
             
             resetMaze()
 
+    def toggle_pause(self):
+        game = M['game']
+        if game is None or not game.running: return
+        if game.paused: game.resume()
+        else: game.pause()
+        self.pause_button.setText("Resume" if game.paused else "Pause")
+
+    def toggle_crowd(self):
+        if M['crowd'] is not None:
+            stop_crowd()
+            return
+        game = M['game']
+        if game is None:
+            cmds.warning("Build a maze before starting a crowd.")
+            return
+        try:
+            count = int(self.crowd_field.text())
+        except ValueError:
+            cmds.warning("Invalid agent count.")
+            return
+        M['crowd'] = projectUtil.MazeCrowd.scatter(game.grid, count, game.finish, M['seed'])
+        show_crowd(M['crowd'])
+        self.crowd_status.setText(f"0/{count}")
+        self.crowd_button.setText("Stop Crowd")
+        self.crowd_timer.start()
+
+    @projectStats.timed('crowd_tick')
+    def _crowd_tick(self):
+        # Simulation runs every tick; the scene only catches up every CROWD_SCENE_SECONDS.
+        crowd = M['crowd']
+        if crowd is None or not isValid(self):
+            stop_crowd(clear=False)
+            return
+        crowd.step_all(crowd.random_directions())
+        finished = crowd.finished
+        if finished == len(crowd) or time.perf_counter() - M['crowd_shown'] >= CROWD_SCENE_SECONDS:
+            show_crowd(crowd)
+            self.crowd_status.setText(f"{finished}/{len(crowd)}")
+        if finished == len(crowd): stop_crowd(clear=False)
+
     def start_timer(self):
         t = M.get('timer')
         if not t or not isValid(t): 
             self.qt_timer = QtCore.QTimer()
-            self.qt_timer.setInterval(1000) 
+            self.qt_timer.setInterval(CLOCK_REFRESH_MS)
             M['timer'] = self.qt_timer
             t = M['timer']
 
         try: t.timeout.connect(self._tick_timer)
         except TypeError: pass
 
-        M['running'] = True
+        if M['game']: M['game'].start()
         t.start()
         
     def keyPressEvent(self, event):
-        if not M['player'] or not cmds.objExists(M['player']):
+        if M['game'] is None:
             return super().keyPressEvent(event)
 
         direction = None
@@ -632,6 +1420,10 @@ class MazeConfigDialog(QtWidgets.QDialog):
         elif key in (Qt.Key_S, Qt.Key_Down): direction = "down"
         elif key in (Qt.Key_A, Qt.Key_Left): direction = "left"
         elif key in (Qt.Key_D, Qt.Key_Right): direction = "right"
+        elif key == Qt.Key_P:
+            self.toggle_pause()
+            event.accept()
+            return
 
         if direction:
             move_player(direction)
@@ -651,6 +1443,7 @@ def run():
 
 if __name__ == '__main__':
     if 'maya.cmds' not in sys.modules:
+        load_qt()
         app = QtWidgets.QApplication(sys.argv)
         run()
         sys.exit(app.exec())
@@ -1 +1,581 @@
-
+import random
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _stack_typecode(count):
+    return 'I' if count < 1 << 32 else 'Q'
+
+def generate_grid(N, seed=None):
+    # Iterative recursive-backtracker over a flat (2N+1)^2 bytearray, 1 = wall.
+    # The stack holds cell indices (z * N + x), so depth is bounded by memory, not recursion.
+    S = 2 * N + 1
+    S2 = 2 * S
+    last = N - 1
+    grid = bytearray(b'\x01') * (S * S)
+    rand = random.Random(seed).random
+
+    stack = array(_stack_typecode(N * N), [0])
+    grid[S + 1] = 0
+    while stack:
+        c = stack[-1]
+        cz, cx = divmod(c, N)
+        g = (2 * cz + 1) * S + 2 * cx + 1
+
+        options = []
+        if cx > 0 and grid[g - 2]: options.append((-1, -2))
+        if cx < last and grid[g + 2]: options.append((1, 2))
+        if cz > 0 and grid[g - S2]: options.append((-N, -S2))
+        if cz < last and grid[g + S2]: options.append((N, S2))
+
+        if not options:
+            stack.pop()
+            continue
+
+        dc, dg = options[int(rand() * len(options))] if len(options) > 1 else options[0]
+        grid[g + dg // 2] = 0
+        grid[g + dg] = 0
+        stack.append(c + dc)
+    return grid
+
+def grid_rows(grid, S):
+    # Row view expected by the builder: M['map'][z][x].
+    return [grid[i:i + S] for i in range(0, S * S, S)]
+
+def row_runs(row):
+    # (start, length) of every run of wall cells in one map row.
+    runs = []
+    n = len(row)
+    x = row.find(1)
+    while x != -1:
+        end = row.find(0, x)
+        if end == -1: end = n
+        runs.append((x, end - x))
+        x = row.find(1, end)
+    return runs
+
+def mesh_rectangles(rows, z0=0):
+    # Greedy meshing of a row stream into (x, z, w, d) wall boxes: each row is run-length encoded
+    # and a run that exactly repeats the span of an open box directly above it extends that box.
+    # Boxes are yielded as soon as they close, so only one row of open boxes is kept.
+    active = {}
+    z = z0
+    for z, row in enumerate(rows, z0):
+        current = {}
+        for x, w in row_runs(row):
+            box = active.pop((x, w), None)
+            if box is None: current[(x, w)] = [z, 1]
+            else:
+                box[1] += 1
+                current[(x, w)] = box
+        for (x, w), (bz, d) in active.items():
+            yield x, bz, w, d
+        active = current
+    for (x, w), (bz, d) in active.items():
+        yield x, bz, w, d
+
+def rasterize_rectangles(rects, S):
+    # Inverse of mesh_rectangles over a full S x S map; used to verify a meshing covers the grid exactly.
+    grid = bytearray(S * S)
+    for x, z, w, d in rects:
+        for i in range(z, z + d):
+            if any(grid[i * S + x:i * S + x + w]):
+                raise ValueError(f"Overlapping wall rectangle at ({x}, {i})")
+            grid[i * S + x:i * S + x + w] = b'\x01' * w
+    return grid
+
+def _random_bits(rng, n):
+    # n coin flips as 0/1 values; drawn from random.Random so a seed gives the same maze with or without NumPy.
+    data = rng.getrandbits(n).to_bytes((n + 7) // 8, 'little') if n else b''
+    if np is not None:
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=n, bitorder='little')
+    return [(data[i >> 3] >> (i & 7)) & 1 for i in range(n)]
+
+def _random_u16(rng, n):
+    data = rng.getrandbits(16 * n).to_bytes(2 * n, 'little') if n else b''
+    if np is not None:
+        return np.frombuffer(data, dtype='<u2').astype(np.int64)
+    return [int.from_bytes(data[i:i + 2], 'little') for i in range(0, 2 * n, 2)]
+
+def _open_grid(N):
+    # All cells open, all walls between cells closed, top row carved into one corridor.
+    S = 2 * N + 1
+    if np is not None:
+        grid = np.ones((S, S), dtype=np.uint8)
+        grid[1::2, 1::2] = 0
+        grid[1, 1:S - 1] = 0
+        return grid
+    grid = bytearray(b'\x01') * (S * S)
+    for z in range(1, S, 2):
+        grid[z * S + 1:z * S + S - 1:2] = bytes(N)
+    grid[S + 1:2 * S - 1] = bytes(S - 2)
+    return grid
+
+def generate_binary_tree(N, seed=None):
+    # Every cell below the top row opens north or west; one vectorised pass per row.
+    S = 2 * N + 1
+    rng = random.Random(seed)
+    grid = _open_grid(N)
+    for z in range(1, N):
+        north = _random_bits(rng, N)
+        north[0] = 1
+        if np is not None:
+            grid[2 * z, 1::2][north == 1] = 0
+            grid[2 * z + 1, 2:S - 1:2][north[1:] == 0] = 0
+        else:
+            above, row = 2 * z * S, (2 * z + 1) * S
+            for x in range(N):
+                if north[x]: grid[above + 2 * x + 1] = 0
+                else: grid[row + 2 * x] = 0
+    return bytearray(grid)
+
+def generate_sidewinder(N, seed=None):
+    # Each row is split into east-running runs; every run opens north from one random member.
+    S = 2 * N + 1
+    rng = random.Random(seed)
+    grid = _open_grid(N)
+    for z in range(1, N):
+        east = _random_bits(rng, N)
+        east[N - 1] = 0
+        if np is not None:
+            grid[2 * z + 1, 2:S - 1:2][east[:N - 1] == 1] = 0
+            ends = np.flatnonzero(east == 0)
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            picks = starts + ((_random_u16(rng, len(ends)) * (ends - starts + 1)) >> 16)
+            grid[2 * z, 2 * picks + 1] = 0
+        else:
+            above, row = 2 * z * S, (2 * z + 1) * S
+            ends = [x for x in range(N) if not east[x]]
+            for x in range(N - 1):
+                if east[x]: grid[row + 2 * x + 2] = 0
+            start = 0
+            for end, r in zip(ends, _random_u16(rng, len(ends))):
+                grid[above + 2 * (start + ((r * (end - start + 1)) >> 16)) + 1] = 0
+                start = end + 1
+    return bytearray(grid)
+
+def eller_rows(N, seed=None):
+    # Eller's algorithm: yields the 2N+1 map rows top to bottom keeping only one row of set labels.
+    S = 2 * N + 1
+    rand = random.Random(seed).random
+    labels = list(range(N))
+    members = {x: [x] for x in range(N)}
+    fresh = N
+
+    yield bytearray(b'\x01') * S
+    for z in range(N):
+        last = z == N - 1
+        row = bytearray(b'\x01') * S
+        row[1:S - 1:2] = bytes(N)
+        for x in range(N - 1):
+            a, b = labels[x], labels[x + 1]
+            if a != b and (last or rand() < 0.5):
+                row[2 * x + 2] = 0
+                if len(members[a]) < len(members[b]): a, b = b, a
+                for i in members[b]: labels[i] = a
+                members[a].extend(members.pop(b))
+        yield row
+        if last: break
+
+        below = bytearray(b'\x01') * S
+        carried = [-1] * N
+        for label, xs in members.items():
+            down = [x for x in xs if rand() < 0.5] or [xs[int(rand() * len(xs))]]
+            for x in down:
+                below[2 * x + 1] = 0
+                carried[x] = label
+        members = {}
+        for x in range(N):
+            label = carried[x]
+            if label < 0:
+                label = fresh; fresh += 1
+            labels[x] = label
+            members.setdefault(label, []).append(x)
+        yield below
+    yield bytearray(b'\x01') * S
+
+def generate_eller(N, seed=None):
+    return bytearray(b''.join(eller_rows(N, seed)))
+
+ALGORITHMS = {
+    'backtracker': generate_grid,
+    'binary_tree': generate_binary_tree,
+    'sidewinder': generate_sidewinder,
+    'eller': generate_eller,
+}
+
+def generate(N, algorithm='backtracker', seed=None):
+    try:
+        fn = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown maze algorithm: {algorithm}") from None
+    return fn(N, seed)
+
+STREAMING = {
+    'eller': eller_rows,
+}
+
+def stream_rows(N, algorithm='eller', seed=None):
+    # Row-at-a-time maze source. Algorithms without a streaming form are generated whole and sliced.
+    rows = STREAMING.get(algorithm)
+    if rows is not None:
+        yield from rows(N, seed)
+        return
+    grid = generate(N, algorithm, seed)
+    S = 2 * N + 1
+    for i in range(0, S * S, S):
+        yield grid[i:i + S]
+
+def chunk_rows(rows, size):
+    # Groups a row stream into (first_z, [rows]) chunks for consumers that work in batches.
+    chunk, z0 = [], 0
+    for z, row in enumerate(rows):
+        if not chunk: z0 = z
+        chunk.append(row)
+        if len(chunk) == size:
+            yield z0, chunk
+            chunk = []
+    if chunk:
+        yield z0, chunk
+
+MOVES = {'up': (0, -1), 'down': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+MOVE_CODES = tuple(MOVES) # 2-bit move codes for replays and MazeCrowd; -1 stays put in MazeCrowd
+_GAME_MOVES = {name: (code, *MOVES[name]) for code, name in enumerate(MOVE_CODES)}
+
+_TO_ASCII = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_ASCII = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def row_bytes(S):
+    return (S + 7) // 8
+
+def pack_row(row):
+    # 0/1 bytes -> little-endian bitset, done with C-level translate/int conversions.
+    S = len(row)
+    return int(bytes(row).translate(_TO_ASCII)[::-1], 2).to_bytes(row_bytes(S), 'little')
+
+def unpack_row(data, S):
+    bits = format(int.from_bytes(data, 'little'), 'b').zfill(S)[::-1][:S]
+    return bytearray(bits.encode('ascii').translate(_FROM_ASCII))
+
+
+class MazeGrid:
+    # Bit-packed S x S wall map: one bit per cell, rows padded to whole bytes (bit x of a row is
+    # cell x), the same layout projectIO writes to disk. Stands in for the old list-of-rows
+    # M['map']: len(grid), grid[z][x] and iteration over rows still work, rows being decoded on
+    # demand, while is_wall(x, z) reads a single bit.
+    __slots__ = ('S', 'row_bytes', 'bits')
+
+    def __init__(self, S, bits=None):
+        self.S = S
+        self.row_bytes = row_bytes(S)
+        self.bits = bytearray(bits) if bits is not None else bytearray(b'\xff') * (S * self.row_bytes)
+        if len(self.bits) != S * self.row_bytes:
+            raise ValueError(f"Expected {S * self.row_bytes} bytes for a {S}x{S} maze, got {len(self.bits)}")
+
+    @classmethod
+    def from_cells(cls, grid, S):
+        # Packs a flat 0/1 bytearray such as projectUtil.generate returns.
+        if np is not None:
+            cells = np.frombuffer(bytes(grid), dtype=np.uint8).reshape(S, S)
+            return cls(S, np.packbits(cells, axis=1, bitorder='little').tobytes())
+        return cls(S, b''.join(pack_row(grid[i:i + S]) for i in range(0, S * S, S)))
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = iter(rows)
+        first = next(rows)
+        return cls(len(first), b''.join(pack_row(row) for row in (first, *rows)))
+
+    def __len__(self):
+        return self.S
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            z, x = index
+            return self.is_wall(x, z)
+        if index < 0: index += self.S
+        if not 0 <= index < self.S:
+            raise IndexError('maze row out of range')
+        return self.row(index)
+
+    def __iter__(self):
+        for z in range(self.S):
+            yield self.row(z)
+
+    def __eq__(self, other):
+        return isinstance(other, MazeGrid) and self.S == other.S and self.bits == other.bits
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+    def is_wall(self, x, z):
+        return (self.bits[z * self.row_bytes + (x >> 3)] >> (x & 7)) & 1
+
+    def row(self, z):
+        start = z * self.row_bytes
+        return unpack_row(self.bits[start:start + self.row_bytes], self.S)
+
+    def column(self, x):
+        S, rb = self.S, self.row_bytes
+        if np is not None:
+            packed = np.frombuffer(self.bits, dtype=np.uint8).reshape(S, rb)
+            return bytearray(((packed[:, x >> 3] >> (x & 7)) & 1).tobytes())
+        byte, shift = x >> 3, x & 7
+        return bytearray((self.bits[z * rb + byte] >> shift) & 1 for z in range(S))
+
+    def cells(self):
+        # Flat 0/1 bytearray, the representation the generators and solvers work on.
+        S = self.S
+        if np is not None:
+            packed = np.frombuffer(self.bits, dtype=np.uint8).reshape(S, self.row_bytes)
+            return bytearray(np.unpackbits(packed, axis=1, count=S, bitorder='little').tobytes())
+        return bytearray(b''.join(self))
+
+    def neighbors(self, x, z):
+        # Cells one move away from cell (x, z), in map coordinates.
+        for dx, dz in MOVES.values():
+            if not self.is_wall(x + dx, z + dz):
+                yield x + 2 * dx, z + 2 * dz
+
+
+class GameClock:
+    # Countdown kept as a deadline on a monotonic clock: remaining() is always deadline - now, so
+    # however late or irregular the caller's timer fires, the clock never drifts. pause() freezes
+    # the remaining time, resume() sets a fresh deadline from it, penalize() pulls it in.
+    __slots__ = ('limit', 'clock', 'deadline', 'frozen')
+
+    def __init__(self, limit, clock=time.perf_counter):
+        self.limit = limit
+        self.clock = clock
+        self.deadline = None
+        self.frozen = None
+
+    @property
+    def paused(self):
+        return self.frozen is not None
+
+    def start(self):
+        self.deadline = self.clock() + self.limit
+        self.frozen = None
+
+    def pause(self):
+        if self.deadline is not None and self.frozen is None:
+            self.frozen = self.deadline - self.clock()
+
+    def resume(self):
+        if self.frozen is not None:
+            self.deadline = self.clock() + self.frozen
+            self.frozen = None
+
+    def penalize(self, seconds):
+        if self.frozen is not None: self.frozen -= seconds
+        elif self.deadline is not None: self.deadline -= seconds
+
+    def remaining(self):
+        if self.deadline is None: return float(self.limit)
+        left = self.frozen if self.frozen is not None else self.deadline - self.clock()
+        return left if left > 0 else 0.0
+
+
+class MazeGame:
+    # Headless game state over a MazeGrid. Positions are map coordinates, cells sit on odd indices.
+    # step() and tick() return an outcome string the UI turns into scene updates:
+    # 'moved', 'wall', 'boundary', 'win', 'timeout' (this move or tick ran the clock out),
+    # 'expired' (the clock was already out), 'paused' (step only), 'running' and 'stopped' (tick only).
+    # In Timed mode every step also costs `penalty` seconds of the clock. Each move taken is kept in
+    # `moves` as a MOVE_CODES index, and `result` holds 'win' or 'timeout' once the game has ended.
+    __slots__ = ('grid', 'S', 'bits', 'row_bytes', 'x', 'z', 'fx', 'fz', 'steps', 'mode',
+                 'time_limit', 'penalty', 'clock', 'running', 'moves', 'result')
+
+    def __init__(self, grid, start, finish, mode='Normal', time_limit=0, penalty=0, clock=time.perf_counter):
+        self.grid = grid
+        self.S = grid.S
+        self.bits, self.row_bytes = grid.bits, grid.row_bytes
+        self.x, self.z = start
+        self.fx, self.fz = finish
+        self.steps = 0
+        self.mode = mode
+        self.time_limit = time_limit
+        self.penalty = penalty
+        self.clock = GameClock(time_limit, clock)
+        self.running = False
+        self.moves = bytearray()
+        self.result = None
+
+    @property
+    def position(self):
+        return self.x, self.z
+
+    @property
+    def finish(self):
+        return self.fx, self.fz
+
+    @property
+    def time_left(self):
+        return self.clock.remaining()
+
+    @property
+    def paused(self):
+        return self.clock.paused
+
+    @property
+    def elapsed(self):
+        # Clock time spent playing, without pauses and step penalties; 0 outside Timed mode.
+        spent = self.time_limit - self.clock.remaining() - self.penalty * self.steps
+        return spent if spent > 0 else 0.0
+
+    def start(self):
+        self.clock.start()
+        self.running = True
+
+    def stop(self):
+        # The clock freezes too, so elapsed and time_left keep the values the game ended with.
+        self.running = False
+        self.clock.pause()
+
+    def _end(self, result):
+        self.stop()
+        self.result = result
+        return result
+
+    def pause(self):
+        if self.running: self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    def step(self, direction):
+        timed = self.mode == 'Timed' and self.running
+        if timed:
+            if self.clock.paused: return 'paused'
+            if self.clock.remaining() <= 0: return 'expired'
+
+        move = _GAME_MOVES.get(direction)
+        if move is None: return 'wall'
+        code, dx, dz = move
+        S = self.S
+        x, z = self.x + dx, self.z + dz
+        if not (0 <= x < S and 0 <= z < S) or (self.bits[z * self.row_bytes + (x >> 3)] >> (x & 7)) & 1:
+            return 'wall'
+        x += dx; z += dz
+        if not (0 <= x < S and 0 <= z < S):
+            return 'boundary'
+
+        self.x = x; self.z = z
+        self.steps += 1
+        self.moves.append(code)
+        if timed and self.penalty: self.clock.penalize(self.penalty)
+        if timed and self.clock.remaining() <= 0: return self._end('timeout')
+        if x == self.fx and z == self.fz: return self._end('win')
+        return 'moved'
+
+    def run(self, directions):
+        # Applies moves until one ends the game; returns the last outcome.
+        result = None
+        step = self.step
+        for direction in directions:
+            result = step(direction)
+            if result in ('win', 'timeout', 'expired', 'paused'): break
+        return result
+
+    def tick(self):
+        # Only reads the clock, so it can be polled at any rate.
+        if not self.running:
+            return 'stopped'
+        if self.clock.remaining() > 0:
+            return 'running'
+        return self._end('win' if self.x == self.fx and self.z == self.fz else 'timeout')
+
+
+class MazeCrowd:
+    # Many agents in one maze, for AI testing and crowd play. Positions are map coordinates kept in
+    # int32 arrays, and step_all() resolves every agent's wall, boundary and finish checks as a few
+    # array operations against an unpacked copy of the grid, so a step costs the same handful of
+    # NumPy calls for ten agents or ten thousand. Agents that reach the finish stay there.
+    # Without NumPy the arrays are lists and step_all() loops.
+    __slots__ = ('grid', 'S', 'walls', 'x', 'z', 'fx', 'fz', 'steps', 'done')
+
+    def __init__(self, grid, starts, finish):
+        self.grid = grid
+        self.S = grid.S
+        self.fx, self.fz = finish
+        xs = [x for x, _ in starts]; zs = [z for _, z in starts]
+        if np is not None:
+            self.walls = np.frombuffer(bytes(grid.cells()), dtype=np.uint8)
+            self.x = np.array(xs, dtype=np.int32); self.z = np.array(zs, dtype=np.int32)
+            self.steps = np.zeros(len(xs), dtype=np.int32)
+            self.done = (self.x == self.fx) & (self.z == self.fz)
+        else:
+            self.walls = grid.cells()
+            self.x, self.z = xs, zs
+            self.steps = [0] * len(xs)
+            self.done = [x == self.fx and z == self.fz for x, z in zip(xs, zs)]
+
+    @classmethod
+    def scatter(cls, grid, count, finish, seed=None):
+        # count agents on random cells (repeats allowed).
+        N = grid.S // 2
+        rng = random.Random(seed)
+        return cls(grid, [(2 * rng.randrange(N) + 1, 2 * rng.randrange(N) + 1) for _ in range(count)], finish)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def finished(self):
+        return int(self.done.sum()) if np is not None else sum(self.done)
+
+    def positions(self):
+        # (n, 2) array of map x, z; a list of tuples without NumPy.
+        if np is not None: return np.stack((self.x, self.z), axis=1)
+        return list(zip(self.x, self.z))
+
+    def random_directions(self, rng=None):
+        # One random direction code per agent; rng is a numpy Generator (random.Random without NumPy).
+        if np is not None:
+            return (rng or np.random.default_rng()).integers(0, len(MOVE_CODES), len(self.x), dtype=np.int8)
+        rng = rng or random
+        return [rng.randrange(len(MOVE_CODES)) for _ in self.x]
+
+    def step_all(self, directions):
+        # Moves every unfinished agent one cell in its direction code; returns how many moved.
+        if np is None: return self._step_all_py(directions)
+        codes = np.asarray(directions, dtype=np.intp)
+        dx = _CROWD_DX[codes]; dz = _CROWD_DZ[codes]
+        S = self.S
+        tx = self.x + 2 * dx; tz = self.z + 2 * dz
+        ok = (tx >= 0) & (tx < S) & (tz >= 0) & (tz < S) & ((dx | dz) != 0) & ~self.done
+        # Index 0 is the maze corner, always a wall, so blocked agents read a wall there.
+        ok &= self.walls[np.where(ok, (self.z + dz) * S + self.x + dx, 0)] == 0
+        moved = ok.view(np.int8)
+        self.x += 2 * dx * moved; self.z += 2 * dz * moved
+        self.steps += moved
+        self.done |= ok & (self.x == self.fx) & (self.z == self.fz)
+        return int(np.count_nonzero(ok))
+
+    def _step_all_py(self, directions):
+        S, walls, x, z, done = self.S, self.walls, self.x, self.z, self.done
+        moves = [MOVES[name] for name in MOVE_CODES] + [(0, 0)]
+        moved = 0
+        for i, code in enumerate(directions):
+            dx, dz = moves[code]
+            if done[i] or not (dx or dz): continue
+            nx, nz = x[i] + 2 * dx, z[i] + 2 * dz
+            if not (0 <= nx < S and 0 <= nz < S) or walls[(z[i] + dz) * S + x[i] + dx]: continue
+            x[i] = nx; z[i] = nz
+            self.steps[i] += 1
+            moved += 1
+            if nx == self.fx and nz == self.fz: done[i] = True
+        return moved
+
+if np is not None:
+    # Lookup tables for step_all: code -1 wraps to the trailing (0, 0) entry.
+    _CROWD_DX = np.array([MOVES[name][0] for name in MOVE_CODES] + [0], dtype=np.int32)
+    _CROWD_DZ = np.array([MOVES[name][1] for name in MOVE_CODES] + [0], dtype=np.int32)
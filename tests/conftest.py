@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The project modules are flat files at the repository root, imported the way Maya imports them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+import json
+import tracemalloc
+
+import pytest
+
+import projectBatch
+import projectIO
+import projectUtil
+
+
+@pytest.mark.parametrize('algorithm', ['eller', 'sidewinder'])
+def test_streamed_level_matches_generated_maze(tmp_path, algorithm):
+    stats = projectBatch.bake_level(str(tmp_path), 3, 30, algorithm, 11, 1.0, stream=True)
+    grid, N, seed, name, start, finish = projectIO.load_maze(tmp_path / stats['file'])
+    assert grid == projectUtil.MazeGrid.from_cells(projectUtil.generate(30, algorithm, 11), 61)
+    assert (N, seed, name, start, finish) == (30, 11, algorithm, (0, 0), (29, 29))
+    assert stats['solution_length'] is None
+
+
+def _peak(out_dir, N, stream):
+    tracemalloc.start()
+    try:
+        projectBatch.bake_level(out_dir, 0, N, 'eller', 1, 1.0, stream=stream)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streamed_eller_level_memory_is_linear(tmp_path):
+    _peak(str(tmp_path), 20, True) # first-use allocations out of the way
+    small, large = _peak(str(tmp_path), 50, True), _peak(str(tmp_path), 200, True)
+    assert large < 4 * small # quadruple N: linear memory roughly quadruples, quadratic would be x16
+    assert large < _peak(str(tmp_path), 50, False)
+
+
+def test_main_streams_a_pack(tmp_path):
+    assert projectBatch.main(['2', '-n', '9', '-a', 'eller', '--stream', '-o', str(tmp_path), '-j', '1']) == 0
+    manifest = [json.loads(line) for line in (tmp_path / projectBatch.MANIFEST_NAME).read_text().splitlines()]
+    assert [m['finish'] for m in manifest] == [[8, 8], [8, 8]]
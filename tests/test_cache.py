@@ -0,0 +1,90 @@
+import os
+
+import projectCache
+import projectIO
+import projectSolver
+import projectUtil
+
+
+BOXES = [((0, 0, 5, 1), None), ((4, 1, 1, 3), None)]
+CHUNKS = [(('combined', 0, 1, bytes(range(16))), [(0, 16, 3, 1), (2, 17, 1, 2)]), (('combined', 2, 0, b'\xff' * 16), [])]
+
+
+def _warm(directory, N=12, seed=5, **kwargs):
+    cache = projectCache.MazeCache(directory=str(directory), **kwargs)
+    entry = cache.entry(N, seed)
+    cache.distances(entry, (1, 1))
+    cache.mesh(entry, ('rectangles', 16), lambda grid: BOXES)
+    cache.mesh(entry, ('combined', 16), lambda grid: CHUNKS)
+    return entry
+
+
+def test_disk_round_trip(tmp_path):
+    entry = _warm(tmp_path)
+    loaded = projectCache.MazeCache(directory=str(tmp_path)).lookup(12, 5)
+    assert loaded.grid == entry.grid
+    assert list(loaded.fields[(1, 1)]) == list(projectSolver.distance_field(entry.grid, entry.grid.S, (1, 1)))
+    assert loaded.meshes == {('rectangles', 16): BOXES, ('combined', 16): CHUNKS}
+
+
+def test_entry_file_is_a_maze_file(tmp_path):
+    entry = _warm(tmp_path)
+    grid, N, seed, algorithm, start, finish = projectIO.load_maze(tmp_path / 'backtracker_12_5.maze')
+    assert (grid, N, seed, algorithm, start, finish) == (entry.grid, 12, 5, 'backtracker', None, None)
+
+
+def test_unnamed_meshes_and_unseeded_mazes_stay_in_memory(tmp_path):
+    cache = projectCache.MazeCache(directory=str(tmp_path))
+    cache.mesh(cache.entry(6, 1), 'scratch', lambda grid: BOXES)
+    cache.distances(cache.entry(6, None), (1, 1))
+    assert os.listdir(tmp_path) == ['backtracker_6_1.maze']
+    assert projectCache.MazeCache(directory=str(tmp_path)).lookup(6, 1).meshes == {}
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    cache = projectCache.MazeCache(directory=str(tmp_path), disk_max_bytes=0)
+    for seed in range(3):
+        cache.entry(10, seed)
+    assert os.listdir(tmp_path) == ['backtracker_10_2.maze']
+    assert cache.stats()['disk_evictions'] == 2
+
+    size = os.path.getsize(tmp_path / 'backtracker_10_2.maze')
+    cache = projectCache.MazeCache(directory=str(tmp_path), disk_max_bytes=2 * size)
+    cache.entry(10, 3)
+    os.utime(tmp_path / 'backtracker_10_2.maze', (0, 0))
+    projectCache.MazeCache(directory=str(tmp_path)).lookup(10, 2) # a disk hit marks it recently used
+    cache.entry(10, 4)
+    assert sorted(os.listdir(tmp_path)) == ['backtracker_10_2.maze', 'backtracker_10_4.maze']
+
+
+def test_damaged_or_outdated_entries_are_misses(tmp_path):
+    _warm(tmp_path)
+    path = tmp_path / 'backtracker_12_5.maze'
+    data = path.read_bytes()
+    trailer = projectIO.HEADER.size + 25 * projectUtil.row_bytes(25)
+    version = trailer + 4
+    path.write_bytes(data[:version] + b'\x00\x00' + data[version + 2:])
+    cache = projectCache.MazeCache(directory=str(tmp_path))
+    assert cache.lookup(12, 5) is None and 'disk_errors' not in cache.stats()
+
+    path.write_bytes(data[:-3])
+    assert cache.lookup(12, 5) is None and cache.stats()['disk_errors'] == 1
+
+    os.rename(path, tmp_path / 'backtracker_12_6.maze')
+    assert cache.lookup(12, 6) is None and cache.stats()['disk_errors'] == 2
+
+
+def test_random_seeds_stay_off_disk_until_asked_for(tmp_path):
+    cache = projectCache.MazeCache(directory=str(tmp_path))
+    entry = cache.entry(8, 77, persistent=False)
+    cache.distances(entry, (1, 1))
+    assert os.listdir(tmp_path) == []
+    assert cache.entry(8, 77) is entry
+    assert os.listdir(tmp_path) == ['backtracker_8_77.maze']
+
+
+def test_failed_writes_leave_no_temporary_files(tmp_path):
+    cache = projectCache.MazeCache(directory=str(tmp_path))
+    cache.entry(4, 1 << 64) # too wide for the .maze header
+    cache.entry(4, -1)
+    assert os.listdir(tmp_path) == [] and cache.stats()['disk_errors'] == 2
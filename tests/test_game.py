@@ -0,0 +1,95 @@
+import projectIO
+import projectSolver
+import projectUI
+import projectUtil
+
+
+N = 12
+SEED = 4
+
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+
+def _directions(path):
+    names = {(2, 0): 'right', (-2, 0): 'left', (0, 2): 'down', (0, -2): 'up'}
+    return [names[(x1 - x0, z1 - z0)] for (x0, z0), (x1, z1) in zip(path, path[1:])]
+
+
+def _game(clock, mode='Timed', time_limit=60, penalty=0.5):
+    grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, 'backtracker', SEED), 2 * N + 1)
+    game = projectUtil.MazeGame(grid, (1, 1), (2 * N - 1, 2 * N - 1), mode, time_limit, penalty, clock)
+    game.start()
+    return game, projectSolver.bfs_path(grid, grid.S, (1, 1), (2 * N - 1, 2 * N - 1))
+
+
+def _replay(game):
+    return projectIO.Replay.from_game(game, SEED, 'backtracker', (0, 0))
+
+
+def test_clock_pause_resume_and_penalty():
+    clock = FakeClock()
+    timer = projectUtil.GameClock(10, clock)
+    assert timer.remaining() == 10
+    timer.start(); clock.now = 3
+    timer.pause(); clock.now = 100
+    assert timer.paused and timer.remaining() == 7
+    timer.resume(); timer.penalize(2); clock.now = 101
+    assert timer.remaining() == 4
+    clock.now = 200
+    assert timer.remaining() == 0
+
+
+def test_win_freezes_the_clock_and_the_replay_verifies():
+    clock = FakeClock()
+    game, path = _game(clock)
+    directions = _directions(path)
+    for direction in directions[:-1]:
+        clock.now += 0.25
+        assert game.step(direction) == 'moved'
+    clock.now += 0.25
+    assert game.step(directions[-1]) == 'win'
+    elapsed = game.elapsed
+    assert elapsed == 0.25 * len(directions)
+
+    clock.now += 30 # the "You Win!" dialog is left open
+    assert game.elapsed == elapsed and game.time_left == 60 - elapsed - 0.5 * game.steps
+    assert game.tick() == 'stopped'
+    assert projectIO.verify_replay(_replay(game), game.grid) is None
+
+
+def test_timeout_freezes_the_clock_and_the_replay_verifies():
+    clock = FakeClock()
+    game, path = _game(clock, time_limit=10)
+    assert game.step(_directions(path)[0]) == 'moved'
+    clock.now = 11
+    assert game.tick() == 'timeout' and game.result == 'timeout'
+    clock.now = 50
+    assert game.time_left == 0 and game.elapsed == 10 - 0.5
+    assert projectIO.verify_replay(_replay(game), game.grid) is None
+
+
+def test_ui_records_the_replay_when_the_game_ends(monkeypatch):
+    clock = FakeClock()
+    game, path = _game(clock)
+    monkeypatch.setitem(projectUI.M, 'game', game)
+    monkeypatch.setitem(projectUI.M, 'seed', SEED)
+    monkeypatch.setitem(projectUI.M, 'maze_algorithm', 'backtracker')
+    monkeypatch.setitem(projectUI.M, 'start', (0, 0))
+    monkeypatch.setitem(projectUI.M, 'distances', projectSolver.DistanceField(game.grid, game.S, game.finish))
+    monkeypatch.setitem(projectUI.M, 'last_replay', None)
+
+    def dialog(*args, **kwargs):
+        clock.now += 30
+        return 'OK'
+    monkeypatch.setattr(projectUI.cmds, 'confirmDialog', dialog, raising=False)
+
+    for direction in _directions(path):
+        clock.now += 0.25
+        projectUI.move_player(direction)
+    replay = projectUI.M['last_replay']
+    assert projectUI.M['game'] is None
+    assert replay.outcome == 'win' and replay.elapsed == 0.25 * len(path[1:])
+    assert projectIO.verify_replay(replay, game.grid) is None
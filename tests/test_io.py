@@ -0,0 +1,107 @@
+import pytest
+
+import projectIO
+import projectUtil
+
+
+def _grid(N, algorithm='backtracker', seed=0):
+    return projectUtil.generate(N, algorithm, seed)
+
+
+@pytest.mark.parametrize('N', [1, 4, 13, 40])
+def test_save_load_flat_grid(tmp_path, N):
+    S = 2 * N + 1
+    grid = _grid(N, 'sidewinder', 7)
+    path = tmp_path / 'flat.maze'
+    projectIO.save_maze(path, grid, N, 7, 'sidewinder', (0, 0), (N - 1, N - 1))
+    loaded, n, seed, algorithm, start, finish = projectIO.load_maze(path)
+    assert loaded == projectUtil.MazeGrid.from_cells(grid, S)
+    assert (n, seed, algorithm, start, finish) == (N, 7, 'sidewinder', (0, 0), (N - 1, N - 1))
+
+
+def test_save_load_maze_grid(tmp_path):
+    N = 20
+    grid = projectUtil.MazeGrid.from_cells(_grid(N, 'eller', 3), 2 * N + 1)
+    path = tmp_path / 'packed.maze'
+    projectIO.save_maze(path, grid, N, 2 ** 40 + 1, 'eller', (3, 4), (19, 0))
+    loaded, n, seed, algorithm, start, finish = projectIO.load_maze(path)
+    assert loaded == grid
+    assert (n, seed, algorithm, start, finish) == (N, 2 ** 40 + 1, 'eller', (3, 4), (19, 0))
+
+
+def test_unseeded_maze_without_positions(tmp_path):
+    N = 5
+    path = tmp_path / 'plain.maze'
+    projectIO.save_maze(path, _grid(N), N)
+    _, n, seed, algorithm, start, finish = projectIO.load_maze(path)
+    assert (n, seed, algorithm, start, finish) == (N, None, 'backtracker', None, None)
+
+
+def test_seed_zero_is_kept(tmp_path):
+    path = tmp_path / 'zero.maze'
+    projectIO.save_maze(path, _grid(3), 3, 0)
+    assert projectIO.load_maze(path)[2] == 0
+
+
+def test_maze_file_rows_and_walls(tmp_path):
+    N = 17
+    S = 2 * N + 1
+    grid = _grid(N, 'backtracker', 11)
+    path = tmp_path / 'rows.maze'
+    projectIO.save_maze(path, grid, N, 11)
+    with projectIO.MazeFile(path) as f:
+        assert (f.N, f.S) == (N, S)
+        for z in range(S):
+            assert f.row(z) == grid[z * S:(z + 1) * S]
+            for x in range(S):
+                assert f.is_wall(x, z) == grid[z * S + x]
+        assert list(f.rows()) == projectUtil.grid_rows(grid, S)
+
+
+@pytest.mark.parametrize('algorithm', sorted(projectUtil.ALGORITHMS))
+def test_write_maze_rows_from_stream(tmp_path, algorithm):
+    N = 12
+    path = tmp_path / 'stream.maze'
+    projectIO.write_maze_rows(path, projectUtil.stream_rows(N, algorithm, 5), N, 5, algorithm)
+    loaded, n, seed, name, _, _ = projectIO.load_maze(path)
+    assert loaded == projectUtil.MazeGrid.from_cells(_grid(N, algorithm, 5), 2 * N + 1)
+    assert (n, seed, name) == (N, 5, algorithm)
+    assert projectUtil.MazeGrid.from_rows(projectUtil.stream_rows(N, algorithm, 5)) == loaded
+
+
+def _write(tmp_path, data):
+    path = tmp_path / 'bad.maze'
+    path.write_bytes(data)
+    return path
+
+
+def test_empty_file(tmp_path):
+    with pytest.raises(ValueError, match='Empty'):
+        projectIO.load_maze(_write(tmp_path, b''))
+
+
+def test_truncated_header(tmp_path):
+    with pytest.raises(ValueError, match='Truncated'):
+        projectIO.load_maze(_write(tmp_path, projectIO.MAGIC + b'\x01'))
+
+
+def test_truncated_rows(tmp_path):
+    path = tmp_path / 'full.maze'
+    projectIO.save_maze(path, _grid(6), 6)
+    with pytest.raises(ValueError, match='Truncated'):
+        projectIO.load_maze(_write(tmp_path, path.read_bytes()[:-1]))
+
+
+def test_bad_magic(tmp_path):
+    path = tmp_path / 'full.maze'
+    projectIO.save_maze(path, _grid(6), 6)
+    with pytest.raises(ValueError, match='Not a maze file'):
+        projectIO.load_maze(_write(tmp_path, b'EZAM' + path.read_bytes()[4:]))
+
+
+def test_bad_version(tmp_path):
+    N = 6
+    header = projectIO.HEADER.pack(projectIO.MAGIC, projectIO.VERSION + 1, 0, N, 0, b'backtracker', -1, -1, -1, -1)
+    data = header + bytes((2 * N + 1) * projectUtil.row_bytes(2 * N + 1))
+    with pytest.raises(ValueError, match='version'):
+        projectIO.load_maze(_write(tmp_path, data))
@@ -0,0 +1,31 @@
+import pytest
+
+import projectUtil
+
+
+@pytest.mark.parametrize('algorithm', sorted(projectUtil.ALGORITHMS))
+@pytest.mark.parametrize('N', [1, 2, 5, 16, 33])
+@pytest.mark.parametrize('seed', [0, 1, 12345])
+def test_rectangles_cover_grid_exactly(algorithm, N, seed):
+    S = 2 * N + 1
+    grid = projectUtil.generate(N, algorithm, seed)
+    rects = list(projectUtil.mesh_rectangles(projectUtil.grid_rows(grid, S)))
+    assert projectUtil.rasterize_rectangles(rects, S) == grid
+
+
+def test_rectangles_from_offset_rows():
+    N, S = 8, 17
+    grid = projectUtil.generate(N, 'backtracker', 3)
+    rows = projectUtil.grid_rows(grid, S)
+    rects = list(projectUtil.mesh_rectangles(rows[:6])) + list(projectUtil.mesh_rectangles(rows[6:], 6))
+    assert projectUtil.rasterize_rectangles(rects, S) == grid
+
+
+def test_row_runs():
+    assert projectUtil.row_runs(bytearray(b'\x01\x01\x00\x01\x00\x00\x01')) == [(0, 2), (3, 1), (6, 1)]
+    assert projectUtil.row_runs(bytearray(3)) == []
+
+
+def test_rasterize_rejects_overlap():
+    with pytest.raises(ValueError, match='Overlapping'):
+        projectUtil.rasterize_rectangles([(0, 0, 3, 1), (2, 0, 1, 2)], 5)
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+import projectCache
+import projectServer
+
+
+def _requests(*requests):
+    async def run():
+        server = await asyncio.start_server(projectServer.GameServer().handle, '127.0.0.1', 0)
+        client = await projectServer.Client.open('127.0.0.1', server.sockets[0].getsockname()[1])
+        try:
+            return [await asyncio.wait_for(client.request(dict(request)), 5) for request in requests]
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('seed', [-1, 1 << 64])
+def test_out_of_range_seed_gets_an_error_reply(tmp_path, monkeypatch, seed):
+    monkeypatch.setattr(projectCache, 'MAZES', projectCache.MazeCache(directory=str(tmp_path)))
+    bad, stats = _requests({'op': 'new', 'N': 5, 'seed': seed}, {'op': 'stats'})
+    assert bad == {'id': 1, 'error': "seed must be 0..2^64-1"}
+    assert stats['sessions'] == 0 and stats['mazes'] == 0
+
+
+def test_session_with_largest_seed(tmp_path, monkeypatch):
+    monkeypatch.setattr(projectCache, 'MAZES', projectCache.MazeCache(directory=str(tmp_path)))
+    opened, = _requests({'op': 'new', 'N': 5, 'seed': (1 << 64) - 1})
+    assert opened['seed'] == (1 << 64) - 1 and 'session' in opened
+    assert projectCache.MAZES.stats().get('disk_errors', 0) == 0
@@ -0,0 +1,69 @@
+import pytest
+
+import projectSolver
+import projectUtil
+
+
+def _check_path(grid, S, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x0, z0), (x1, z1) in zip(path, path[1:]):
+        assert abs(x1 - x0) + abs(z1 - z0) == 2
+        assert not grid[(z0 + z1) // 2 * S + (x0 + x1) // 2]
+
+
+def _with_loops(grid, S):
+    # Opens every fifth interior wall between two cells, so searches have more than one route.
+    for g in range(S + 1, S * S - S - 1, 5):
+        x, z = g % S, g // S
+        if (x + z) % 2 and 0 < x < S - 1: grid[g] = 0
+    return grid
+
+
+@pytest.mark.parametrize('algorithm', sorted(projectUtil.ALGORITHMS))
+@pytest.mark.parametrize('loops', [False, True])
+@pytest.mark.parametrize('method', sorted(projectSolver.SOLVERS))
+def test_solvers_find_shortest_paths(algorithm, loops, method):
+    N = 24
+    S = 2 * N + 1
+    grid = projectUtil.generate(N, algorithm, 3)
+    if loops: grid = _with_loops(grid, S)
+    start = (1, 1)
+    dist = projectSolver.distance_field(grid, S, start)
+    for goal in ((S - 2, S - 2), (1, S - 2), (S - 2, 1), start):
+        path = projectSolver.solve(grid, S, start, goal, method)
+        _check_path(grid, S, path, start, goal)
+        assert len(path) - 1 == dist[(goal[1] // 2) * N + goal[0] // 2]
+
+
+def test_open_masks_match_the_map():
+    N = 9
+    S = 2 * N + 1
+    grid = _with_loops(projectUtil.generate(N, 'backtracker', 1), S)
+    mask = projectSolver.open_masks(grid, S)
+    for c in range(N * N):
+        g = (2 * (c // N) + 1) * S + 2 * (c % N) + 1
+        expected = (not grid[g + 1]) | (not grid[g - 1]) << 1 | (not grid[g + S]) << 2 | (not grid[g - S]) << 3
+        assert mask[c] == expected
+
+
+def test_distance_field_on_maze_grid():
+    N = 15
+    S = 2 * N + 1
+    grid = projectUtil.generate(N, 'sidewinder', 2)
+    packed = projectUtil.MazeGrid.from_cells(grid, S)
+    assert projectSolver.distance_field(packed, S, (1, 1)) == projectSolver.distance_field(grid, S, (1, 1))
+
+
+@pytest.mark.parametrize('algorithm', sorted(projectUtil.ALGORITHMS))
+def test_next_step_matches_junction_graph(algorithm):
+    N = 14
+    S = 2 * N + 1
+    grid = projectUtil.MazeGrid.from_cells(projectUtil.generate(N, algorithm, 5), S)
+    finish = (S - 2, 1)
+    field = projectSolver.DistanceField(grid, S, finish)
+    junctions = projectSolver.JunctionGraph(grid, S)
+    assert field.next_step(*finish) is None
+    for z in range(1, S, 2):
+        for x in range(1, S, 2):
+            assert field.next_step(x, z) == junctions.next_step((x, z), finish)
+            assert junctions.distance((x, z), finish) == field.steps_from(x, z)
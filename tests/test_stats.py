@@ -0,0 +1,14 @@
+import projectStats
+
+
+def test_snapshot_reports_timers_in_ms_and_counters():
+    stats = projectStats.Stats()
+    stats.enabled = True
+    stats.add('build', 0.004)
+    stats.add('build', 0.002)
+    stats.count('walls', 3)
+    snapshot = stats.snapshot()
+    assert snapshot['counters'] == {'walls': 3}
+    timer = snapshot['timers']['build']
+    assert timer['count'] == 2 and timer['last_ms'] == 2.0 and timer['max_ms'] == 4.0
+    assert abs(timer['total_ms'] - 6.0) < 1e-9 and abs(timer['mean_ms'] - 3.0) < 1e-9